@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test de charge : réservations concurrentes d'un même créneau
+
+Vérifie qu'une seule réservation l'emporte quand des centaines de demandes
+visent le même créneau :
+
+1. directement sur BookingRepository (requêtes asyncio simultanées)
+2. via le webhook /book de l'application (ASGI, sans réseau), appelants distincts
+3. depuis plusieurs processus partageant le même fichier SQLite (workers)
+
+Vérifie aussi l'idempotence du webhook : les appels rejoués d'un même appelant
+(même conversation, même créneau) renvoient tous la réservation d'origine.
+
+Usage : python benchmark_booking_concurrency.py [réservations_simultanées]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Base temporaire choisie avant l'import de l'application
+_DB_DIR = tempfile.mkdtemp(prefix="bookings-")
+os.environ["BOOKING_DB_PATH"] = os.path.join(_DB_DIR, "webhook.db")
+os.environ.setdefault("SIMPLAUTO_SUBMIT_BOOKINGS", "false")  # Réservations locales uniquement
+
+import httpx  # noqa: E402
+
+from booking_store import BookingRepository, SlotAlreadyBooked  # noqa: E402
+
+CLIENT_INFO = {
+    "first_name": "Jean",
+    "last_name": "Dupont",
+    "phone": "0600000000",
+    "email": "jean.dupont@example.com",
+    "vehicle_brand": "Renault",
+    "vehicle_model": "Clio",
+    "license_plate": "AB-123-CD",
+    "vehicle_type": "voiture_particuliere"
+}
+
+
+async def _race(repository: BookingRepository, attempts: int, slot_id: str):
+    """Lance `attempts` réservations simultanées ; retourne (gagnantes, refusées)"""
+    async def attempt():
+        try:
+            return await repository.create_booking("center-1", slot_id, CLIENT_INFO)
+        except SlotAlreadyBooked:
+            return None
+
+    outcomes = await asyncio.gather(*(attempt() for _ in range(attempts)))
+    wins = [booking for booking in outcomes if booking is not None]
+    return wins, len(outcomes) - len(wins)
+
+
+async def repository_race(attempts: int) -> bool:
+    repository = BookingRepository(os.path.join(_DB_DIR, "repository.db"))
+    t0 = time.perf_counter()
+    wins, refused = await _race(repository, attempts, "slot_center-1_20250811_0900")
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    # Créneaux différents : toutes les réservations passent
+    t1 = time.perf_counter()
+    distinct = await asyncio.gather(*(
+        repository.create_booking("center-1", f"slot_center-1_20250812_{i:04d}", CLIENT_INFO)
+        for i in range(attempts)
+    ))
+    distinct_elapsed = (time.perf_counter() - t1) * 1000
+    ids = {booking["id"] for booking in distinct}
+    await repository.close()
+
+    ok = len(wins) == 1 and refused == attempts - 1 and len(ids) == attempts
+    print(f"{'✅' if ok else '❌'} Dépôt : {attempts} demandes même créneau → {len(wins)} acceptée, {refused} refusées ({elapsed:.0f} ms)")
+    print(f"   {attempts} créneaux distincts → {len(ids)} réservations, identifiants uniques ({distinct_elapsed:.0f} ms, "
+          f"{attempts / distinct_elapsed * 1000:.0f} réservations/s)")
+    return ok
+
+
+async def webhook_race(attempts: int) -> bool:
+    from backend_api import app
+    from booking_store import booking_store
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://webhook") as client:
+        responses = await asyncio.gather(*(
+            client.post(
+                "/webhook/elevenlabs/center-1/book",
+                json={
+                    "slot_id": "slot_center-1_20250811_1000",
+                    "client_info": {**CLIENT_INFO, "phone": f"06{i:08d}"}
+                }
+            )
+            for i in range(attempts)
+        ))
+    await booking_store.close()
+
+    confirmed = [response.json() for response in responses if "booking_id" in response.json()]
+    taken = sum(bool(response.json().get("slot_taken")) for response in responses)
+    ok = len(confirmed) == 1 and taken == attempts - 1
+    print(f"{'✅' if ok else '❌'} Webhook : {attempts} demandes → {len(confirmed)} confirmée, {taken} « créneau déjà réservé »")
+    return ok
+
+
+async def webhook_replay(attempts: int) -> bool:
+    from backend_api import app
+    from booking_store import booking_store
+
+    payload = {
+        "slot_id": "slot_center-1_20250811_1030",
+        "client_info": CLIENT_INFO,
+        "conversation_id": "conv-replay"
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://webhook") as client:
+        url = "/webhook/elevenlabs/center-1/book"
+        # Rejeux simultanés, puis rejeux après coup (réponse enregistrée)
+        concurrent = await asyncio.gather(*(client.post(url, json=payload) for _ in range(attempts)))
+        t0 = time.perf_counter()
+        later = [await client.post(url, json=payload) for _ in range(attempts)]
+        elapsed = (time.perf_counter() - t0) * 1000
+        # Clé explicite : même réponse quel que soit le contenu rejoué
+        explicit = [
+            await client.post(url, json={**payload, "slot_id": slot_id}, headers={"Idempotency-Key": "retry-1"})
+            for slot_id in ("slot_center-1_20250811_1100", "slot_center-1_20250811_1130")
+        ]
+    bookings = await booking_store.list_bookings("center-1")
+    await booking_store.close()
+
+    booking_ids = {response.json().get("booking_id") for response in concurrent + later}
+    explicit_ids = {response.json().get("booking_id") for response in explicit}
+    replayed = [booking for booking in bookings if booking["slot_id"] == payload["slot_id"]]
+    ok = len(booking_ids) == 1 and None not in booking_ids and len(replayed) == 1 and len(explicit_ids) == 1
+    print(f"{'✅' if ok else '❌'} Rejeux : {2 * attempts} appels identiques → {len(replayed)} réservation, "
+          f"{len(booking_ids)} identifiant ; {attempts} rejeux après coup en {elapsed:.0f} ms "
+          f"({elapsed / attempts:.2f} ms/appel)")
+    return ok
+
+
+def _process_race(path: str, attempts: int, results) -> None:
+    async def run():
+        repository = BookingRepository(path)
+        wins, _ = await _race(repository, attempts, "slot_center-1_20250811_1100")
+        await repository.close()
+        return len(wins)
+
+    results.put(asyncio.run(run()))
+
+
+def multiprocess_race(processes: int, attempts: int) -> bool:
+    path = os.path.join(_DB_DIR, "workers.db")
+    BookingRepository(path)  # Même fichier pour tous les workers
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_process_race, args=(path, attempts, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    wins = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    ok = wins == 1
+    print(f"{'✅' if ok else '❌'} {processes} processus × {attempts} demandes sur le même fichier → {wins} acceptée")
+    return ok
+
+
+def main(attempts: int) -> int:
+    print(f"📊 Réservations concurrentes (bases dans {_DB_DIR})")
+    ok = asyncio.run(repository_race(attempts))
+    ok = asyncio.run(webhook_race(attempts)) and ok
+    ok = asyncio.run(webhook_replay(attempts)) and ok
+    ok = multiprocess_race(4, attempts // 4 or 1) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark : taux de succès du cache de créneaux selon le backend et le nombre de workers
+
+Chaque worker est un processus qui rejoue des get_or_fetch sur les mêmes clés
+(centres × types de véhicules, popularité inégale), comme plusieurs workers
+uvicorn derrière le même Procfile. L'appel amont est simulé (créneaux générés
++ latence fixe). Backends comparés :
+
+- memory : un cache par processus (froid dans chaque worker)
+- shm    : segments multiprocessing.shared_memory partagés
+- redis  : protocole Redis, testé contre un serveur RESP local minimal lancé
+           par ce script (ou un vrai serveur via SLOT_CACHE_REDIS_URL)
+
+Usage : python benchmark_cache_backends.py [requêtes_par_worker]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from slot_cache import SLOT_COLUMNS_CODEC, SlotCache
+from slot_cache_backends import InProcessBackend, RedisBackend, SharedMemoryBackend
+from slot_index import PARIS_TZ
+from slot_store import SlotColumns
+from standin_servers import free_port
+
+CENTERS = 20
+VEHICLE_TYPES = 3
+UPSTREAM_LATENCY = 0.02  # secondes par appel Simplauto simulé
+TTL = 30.0
+
+
+# --- Serveur RESP minimal (GET / SET EX / DEL / SCAN / PING / SELECT / AUTH) ---
+
+class _RespStandin:
+    """Serveur compatible Redis, en mémoire, pour les essais locaux"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            size = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _execute(self, args: List[bytes]) -> bytes:
+        command = args[0].upper()
+        if command in (b"PING", b"SELECT", b"AUTH"):
+            return b"+OK\r\n" if command != b"PING" else b"+PONG\r\n"
+        if command == b"GET":
+            value = self._get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            expires_at = None
+            if len(args) >= 5 and args[3].upper() == b"EX":
+                expires_at = time.time() + int(args[4])
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        if command == b"SCAN":
+            prefix = args[3][:-1] if len(args) > 3 else b""
+            keys = [key for key in self.data if key.startswith(prefix)]
+            body = b"".join(b"$%d\r\n%s\r\n" % (len(key), key) for key in keys)
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n%s" % (len(keys), body)
+        return b"-ERR unknown command\r\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                writer.write(self._execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _start_resp_standin() -> str:
+    """Lance le serveur RESP dans un thread ; retourne son URL"""
+    port = free_port()
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_server(_RespStandin().handle, "127.0.0.1", port))
+        ready.set()
+        loop.run_until_complete(server.serve_forever())
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+# --- Workers -------------------------------------------------------------------
+
+def _payload(center: int) -> list:
+    start = datetime(2025, 8, 4, 8, 0)
+    return [
+        {
+            "id": f"c{center}-{i}",
+            "starts_at": PARIS_TZ.localize(start + timedelta(days=i // 20, minutes=30 * (i % 20))).isoformat(),
+            "price": 78,
+            "is_available": True
+        }
+        for i in range(140)
+    ]
+
+
+def _make_cache(backend_name: str, redis_url: str, prefix: str) -> SlotCache:
+    if backend_name == "shm":
+        backend = SharedMemoryBackend(256, SLOT_COLUMNS_CODEC, prefix=prefix)
+    elif backend_name == "redis":
+        backend = RedisBackend(256, SLOT_COLUMNS_CODEC, url=redis_url, prefix=prefix)
+    else:
+        backend = InProcessBackend(256)
+    return SlotCache(ttl=TTL, stale_ttl=0, backend=backend)
+
+
+def _worker(backend_name: str, redis_url: str, prefix: str, requests: int, seed: int, results) -> None:
+    cache = _make_cache(backend_name, redis_url, prefix)
+    rng = random.Random(seed)
+    # Popularité inégale des centres (quelques centres reçoivent la plupart des appels)
+    weights = [1 / (rank + 1) for rank in range(CENTERS)]
+
+    async def fetch(center: int) -> SlotColumns:
+        await asyncio.sleep(UPSTREAM_LATENCY)
+        return SlotColumns.from_api(_payload(center))
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(requests):
+            center = rng.choices(range(CENTERS), weights)[0]
+            vehicle = rng.randrange(VEHICLE_TYPES)
+            columns = await cache.get_or_fetch((f"center-{center}", vehicle), lambda: fetch(center))
+            next(columns.iter_rows(), None)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    results.put((cache.hits, cache.misses, elapsed))
+
+
+def run_backend(backend_name: str, workers: int, requests: int, redis_url: str) -> Tuple[float, float]:
+    """Taux de succès global et durée moyenne par requête (ms)"""
+    prefix = f"bench{os.getpid()}{backend_name}{workers}"
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(backend_name, redis_url, prefix, requests, seed, results))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    # Nettoyage des segments / clés du banc d'essai
+    _make_cache(backend_name, redis_url, prefix).invalidate()
+
+    hits = sum(outcome[0] for outcome in outcomes)
+    misses = sum(outcome[1] for outcome in outcomes)
+    elapsed = sum(outcome[2] for outcome in outcomes)
+    return hits / (hits + misses), elapsed / (workers * requests) * 1000
+
+
+def main(requests: int) -> None:
+    redis_url = os.getenv("SLOT_CACHE_REDIS_URL") or _start_resp_standin()
+    print(f"📊 {requests} requêtes par worker, {CENTERS * VEHICLE_TYPES} clés, amont simulé {UPSTREAM_LATENCY * 1000:.0f} ms")
+    print(f"{'backend':>8} {'workers':>8} {'succès':>8} {'ms/requête':>11}")
+    for backend_name in ("memory", "shm", "redis"):
+        for workers in (1, 2, 4, 8):
+            hit_rate, per_request = run_backend(backend_name, workers, requests, redis_url)
+            print(f"{backend_name:>8} {workers:>8} {hit_rate:>8.1%} {per_request:>11.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai : disjoncteur Simplauto et repli sur les créneaux en cache
+
+Sert le Simplauto de remplacement (standin_servers.py) sur un port local, en
+réglant sa latence et son taux d'erreur, puis appelle le webhook get_slots à
+travers quatre phases : amont sain, amont lent, amont en erreur 503, amont
+rétabli. Pour chaque phase : latence du webhook, réponses servies depuis le
+cache périmé et état du disjoncteur.
+
+Le cache est réglé avec ttl = stale_ttl = 0 pour que chaque appel interroge
+l'amont (le repli garde la dernière réponse connue).
+
+Usage : python benchmark_circuit_breaker.py [appels_par_phase] [latence_lente_s]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+# Ouverture courte du disjoncteur, lue à l'import de l'application (SimplautoClient)
+os.environ.setdefault("SIMPLAUTO_BREAKER_OPEN_SECONDS", "3")
+
+from backend_api import app  # noqa: E402
+from simplauto_client import simplauto  # noqa: E402
+from slot_cache import slot_cache  # noqa: E402
+from standin_servers import StandinSettings, create_standin_app, serve_standin  # noqa: E402
+
+
+async def _run_phase(client: httpx.AsyncClient, label: str, calls: int) -> None:
+    latencies = []
+    stale = 0
+    unavailable = 0
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        response = await client.post(
+            "/webhook/elevenlabs/fake-center/get_slots",
+            json={"vehicle_type": "voiture_particuliere", "preferred_time": "any"}
+        )
+        latencies.append((time.perf_counter() - t0) * 1000)
+        data = response.json()
+        stale += bool(data.get("stale"))
+        unavailable += "planning" in data.get("response", "")
+
+    breaker = simplauto.breaker.stats()
+    print(
+        f"{label:<22} p50={statistics.median(latencies):8.1f} ms  max={max(latencies):8.1f} ms  "
+        f"périmées={stale:>3}/{calls}  indisponible={unavailable:>3}  circuit={breaker['state']}"
+    )
+
+
+async def main(calls: int, slow_latency: float) -> None:
+    # Créneaux sur les 5 prochains jours, 9h-17h ; latence et erreurs réglées par phase
+    settings = StandinSettings("STANDIN_SIMPLAUTO", latency="0", error_rate=0.0, slots_per_day=9, horizon_days=5)
+    port = int(os.getenv("FAKE_SIMPLAUTO_PORT", "0")) or None
+
+    # Chaque appel webhook interroge l'amont ; la dernière réponse reste disponible en repli
+    slot_cache.ttl = 0
+    slot_cache.stale_ttl = 0
+
+    breaker = simplauto.breaker
+    print(
+        f"📊 budget={breaker.latency_budget}s lent>{breaker.slow_call_threshold}s "
+        f"seuil={breaker.failure_rate_threshold:.0%} ouverture={breaker.open_seconds}s"
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with serve_standin(create_standin_app(settings), port) as base_url:
+        await simplauto.reconfigure(base_url=base_url)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://webhook") as client:
+                await _run_phase(client, "Amont sain", calls)
+
+                settings.set_latency(f"fixed:{slow_latency * 1000:g}")
+                await _run_phase(client, f"Amont lent ({slow_latency:.0f}s)", calls)
+
+                settings.set_latency("0")
+                settings.error_rate = 1.0
+                await _run_phase(client, "Amont en erreur 503", calls)
+
+                # Laisser expirer l'ouverture : l'appel d'essai referme le circuit
+                settings.error_rate = 0.0
+                await asyncio.sleep(breaker.open_seconds)
+                await _run_phase(client, "Amont rétabli", calls)
+        finally:
+            await simplauto.close()
+
+    print(json.dumps({"cache": slot_cache.stats(), "circuit_breaker": breaker.stats()}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    ))
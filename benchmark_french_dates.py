@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark : formatage des dates en français (french_dates) contre strftime
+
+- exactitude : chaque jour de 1900 à 2100 comparé à strftime en locale C,
+  noms anglais traduits (référence indépendante des tables françaises)
+- indépendance de la locale : sortie identique quelle que soit LC_TIME,
+  alors que strftime change (locales disponibles sur la machine)
+- vitesse : format_full_date / format_datetime contre strftime
+
+Usage : python benchmark_french_dates.py [appels]
+"""
+
+import locale
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from french_dates import DAY_NAMES, MONTH_NAMES, format_datetime, format_full_date, format_month_date
+
+ENGLISH_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+ENGLISH_MONTHS = (
+    "", "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+LOCALES = ("C", "C.UTF-8", "en_US.UTF-8", "de_DE.UTF-8", "fr_FR.UTF-8")
+
+
+def check_calendar() -> int:
+    """Compare chaque jour de 1900 à 2100 à strftime (locale C) traduit"""
+    locale.setlocale(locale.LC_TIME, "C")
+    day = date(1900, 1, 1)
+    checked = 0
+    while day.year <= 2100:
+        weekday, day_number, month, year = day.strftime("%A %d %B %Y").split()
+        expected = f"{DAY_NAMES[ENGLISH_DAYS.index(weekday)]} {int(day_number)} {MONTH_NAMES[ENGLISH_MONTHS.index(month)]} {year}"
+        assert format_full_date(day) == expected, (day, format_full_date(day), expected)
+        assert format_month_date(day) == expected.split(" ", 1)[1]
+        day += timedelta(days=1)
+        checked += 1
+    return checked
+
+
+def check_locales(moment: datetime) -> None:
+    expected = format_datetime(moment)
+    for name in LOCALES:
+        try:
+            locale.setlocale(locale.LC_TIME, name)
+        except locale.Error:
+            continue
+        assert format_datetime(moment) == expected
+        print(f"   {name:<12} strftime : {moment.strftime('%A %d %B %Y à %H:%M'):<34} french_dates : {format_datetime(moment)}")
+    locale.setlocale(locale.LC_TIME, "C")
+
+
+def _per_call_ns(fn, arg, calls: int) -> float:
+    t0 = time.perf_counter_ns()
+    for _ in range(calls):
+        fn(arg)
+    return (time.perf_counter_ns() - t0) / calls
+
+
+def main(calls: int) -> None:
+    print(f"✅ {check_calendar()} jours vérifiés (1900-2100)")
+
+    moment = datetime(2025, 8, 11, 9, 30)
+    print("Sortie selon la locale du processus :")
+    check_locales(moment)
+
+    cases = (
+        ("%A %d %B %Y", lambda value: value.strftime("%A %d %B %Y"), format_full_date),
+        ("%A %d %B %Y à %H:%M", lambda value: value.strftime("%A %d %B %Y à %H:%M"), format_datetime),
+    )
+    print(f"\n{'format':<22} {'strftime ns':>12} {'french_dates ns':>16} {'gain':>7}")
+    for label, with_strftime, formatter in cases:
+        strftime_ns = _per_call_ns(with_strftime, moment, calls)
+        formatter_ns = _per_call_ns(formatter, moment, calls)
+        print(f"{label:<22} {strftime_ns:>12.0f} {formatter_ns:>16.0f} {strftime_ns / formatter_ns:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark : requêtes Simplauto doublées (hedging) face à une latence de queue
+
+Sert le Simplauto de remplacement (standin_servers.py) avec une latence à
+longue queue (la plupart des réponses en ~20 ms, quelques-unes en centaines
+de millisecondes ou en secondes), puis compare les centiles de fetch_slots
+sur le pool partagé sans doublage et avec doublage.
+
+Usage : python benchmark_hedging.py [nombre_appels] [centile]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from simplauto_client import SimplautoClient
+from standin_servers import StandinSettings, create_standin_app, percentile, serve_standin
+
+
+def long_tail_latency(rng: random.Random) -> float:
+    """Latence simulée (secondes) : 93 % rapides, 5 % lentes, 2 % très lentes"""
+    draw = rng.random()
+    if draw < 0.93:
+        return rng.uniform(0.010, 0.030)
+    if draw < 0.98:
+        return rng.uniform(0.200, 0.400)
+    return rng.uniform(1.500, 2.000)
+
+
+async def _measure(client: SimplautoClient, iterations: int, concurrency: int = 8) -> list:
+    """Latences (ms) de fetch_slots, avec quelques appels simultanés comme en production"""
+    params = {"center_id": "bench", "is_available": True, "vehicle_engine": 1, "vehicle_type": 6}
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one_call():
+        async with semaphore:
+            t0 = time.perf_counter()
+            await client.fetch_slots(params)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    await asyncio.gather(*(one_call() for _ in range(iterations)))
+    return samples
+
+
+def _report(label: str, samples_ms: list) -> None:
+    print(
+        f"{label:<20} p50={statistics.median(samples_ms):7.1f} ms  p95={percentile(samples_ms, 95):7.1f} ms  "
+        f"p99={percentile(samples_ms, 99):7.1f} ms  max={max(samples_ms):7.1f} ms"
+    )
+
+
+async def main(iterations: int, percent: float) -> None:
+    # Une cinquantaine de créneaux, latence à longue queue reproductible (graine 42)
+    settings = StandinSettings("STANDIN_SIMPLAUTO", error_rate=0.0, slots_per_day=10, horizon_days=5, seed=42)
+    settings.set_latency(long_tail_latency)
+
+    async with serve_standin(create_standin_app(settings)) as base_url:
+        plain = SimplautoClient(base_url=base_url)
+        plain.hedger.enabled = False
+        await plain.start()
+        before = await _measure(plain, iterations)
+        await plain.close()
+
+        hedged = SimplautoClient(base_url=base_url)
+        hedged.hedger.enabled = True
+        hedged.hedger.percentile = percent
+        await hedged.start()
+        after = await _measure(hedged, iterations)
+        await hedged.close()
+
+    print(f"📊 {iterations} appels vers {base_url}/private-api/slots/ (doublage au p{percent:g})")
+    _report("Sans doublage", before)
+    _report("Avec doublage", after)
+    stats = hedged.hedger.stats()
+    print(
+        f"Doublages : {stats['hedges_fired']} envoyés ({stats['hedge_rate']:.1%} des requêtes), "
+        f"{stats['hedges_won']} gagnants, {stats['hedges_capped']} plafonnés, "
+        f"délai final {stats['delay_seconds'] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 95.0
+    ))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark : client HTTP éphémère vs pool de connexions partagé
+
+Sert le Simplauto de remplacement (standin_servers.py) sur un port local et
+compare la latence d'un appel /private-api/slots/ avec un httpx.AsyncClient
+neuf à chaque appel (ancien comportement) et avec le pool partagé de
+simplauto_client.
+
+Usage : python benchmark_http_pool.py [nombre_appels]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from simplauto_client import SimplautoClient
+from standin_servers import StandinSettings, create_standin_app, percentile, serve_standin
+
+
+def _report(label: str, samples_ms: list) -> None:
+    print(
+        f"{label:<28} p50={statistics.median(samples_ms):7.3f} ms  p95={percentile(samples_ms, 95):7.3f} ms  "
+        f"moyenne={statistics.mean(samples_ms):7.3f} ms"
+    )
+
+
+async def main(iterations: int) -> None:
+    # Une cinquantaine de créneaux (10 par jour sur 5 jours), sans latence ni erreur
+    standin = create_standin_app(StandinSettings(
+        "STANDIN_SIMPLAUTO", latency="0", error_rate=0.0, slots_per_day=10, horizon_days=5
+    ))
+    params = {"center_id": "bench", "is_available": True, "vehicle_engine": 1, "vehicle_type": 6}
+
+    async with serve_standin(standin) as base_url:
+        # Avant : un client neuf par appel
+        before = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{base_url}/private-api/slots/", params=params, timeout=10)
+                response.raise_for_status()
+                response.json()
+            before.append((time.perf_counter() - t0) * 1000)
+
+        # Après : pool partagé
+        pooled = SimplautoClient(base_url=base_url)
+        await pooled.start()
+        after = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            await pooled.fetch_slots(params)
+            after.append((time.perf_counter() - t0) * 1000)
+        await pooled.close()
+
+    print(f"📊 {iterations} appels vers {base_url}/private-api/slots/")
+    _report("Client éphémère (avant)", before)
+    _report("Pool partagé (après)", after)
+    print(f"Gain p50 : {statistics.median(before) - statistics.median(after):.3f} ms par appel")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark : latence du webhook /book avec les notifications en outbox
+
+Un fournisseur HTTP local (ASGI, sans réseau) reçoit les lots SMS / email /
+centre avec une latence fixe et un taux d'échec (503) configurables.
+
+1. envoi en ligne : réservation puis envoi des 3 notifications avant de répondre
+2. outbox : le webhook répond une fois la transaction validée, les workers
+   de notifications.py envoient ensuite par lots et retentent les échecs
+
+Vérifie que chaque notification est livrée malgré les échecs du fournisseur.
+
+Usage : python benchmark_notifications.py [réservations] [latence_ms] [taux_échec]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Base temporaire choisie avant l'import de l'application
+_DB_DIR = tempfile.mkdtemp(prefix="notifications-")
+os.environ["BOOKING_DB_PATH"] = os.path.join(_DB_DIR, "bookings.db")
+os.environ.setdefault("SIMPLAUTO_SUBMIT_BOOKINGS", "false")  # Réservations locales uniquement
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+
+from booking_store import BookingRepository, booking_store  # noqa: E402
+from notifications import CHANNELS, HttpSink, booking_notifications, notification_dispatcher  # noqa: E402
+from standin_servers import percentile  # noqa: E402
+
+CLIENT_INFO = {
+    "first_name": "Jean",
+    "last_name": "Dupont",
+    "phone": "0600000000",
+    "email": "jean.dupont@example.com",
+    "vehicle_brand": "Renault",
+    "vehicle_model": "Clio",
+    "license_plate": "AB-123-CD",
+    "vehicle_type": "voiture_particuliere"
+}
+
+
+def provider_standin(latency: float, failure_rate: float, seed: int = 7) -> FastAPI:
+    """Passerelle SMS / email / centre simulée : latence fixe, échecs aléatoires"""
+    provider = FastAPI()
+    provider.state.delivered = set()
+    provider.state.calls = 0
+    rng = random.Random(seed)
+
+    @provider.post("/notify")
+    async def notify(request: Request):
+        provider.state.calls += 1
+        await asyncio.sleep(latency)
+        if rng.random() < failure_rate:
+            return Response(status_code=503)
+        body = await request.json()
+        provider.state.delivered.update((body["channel"], item["id"]) for item in body["notifications"])
+        return {"accepted": len(body["notifications"])}
+
+    return provider
+
+
+def _sinks(provider: FastAPI) -> dict:
+    transport = httpx.ASGITransport(app=provider)
+    return {channel: HttpSink("http://provider/notify", channel, transport=transport) for channel in CHANNELS}
+
+
+def _percentiles(samples: list) -> str:
+    return f"p50 {statistics.median(samples):.1f} ms, p95 {percentile(samples, 95):.1f} ms"
+
+
+async def inline(bookings: int, latency: float) -> list:
+    """Réservation puis envoi des notifications avant de répondre (fournisseur sans échec)"""
+    repository = BookingRepository(os.path.join(_DB_DIR, "inline.db"))
+    sinks = _sinks(provider_standin(latency, 0.0))
+    samples = []
+    for i in range(bookings):
+        t0 = time.perf_counter()
+        booking = await repository.create_booking("center-1", f"slot_center-1_20250811_{i:04d}", CLIENT_INFO)
+        for channel, payload in booking_notifications("center-1", booking["slot_id"], CLIENT_INFO, "lundi"):
+            await sinks[channel].send_batch([{"id": i, "booking_id": booking["id"], **payload}])
+        samples.append((time.perf_counter() - t0) * 1000)
+    for sink in sinks.values():
+        await sink.close()
+    await repository.close()
+    return samples
+
+
+async def outbox(bookings: int, latency: float, failure_rate: float) -> bool:
+    from backend_api import app
+
+    provider = provider_standin(latency, failure_rate)
+    notification_dispatcher.sinks = _sinks(provider)
+    notification_dispatcher.backoff = 0.05
+    notification_dispatcher.max_backoff = 0.5
+    notification_dispatcher.poll_interval = 0.05
+    notification_dispatcher.max_attempts = 50
+    notification_dispatcher.start()
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://webhook") as client:
+        for i in range(bookings):
+            # Identifiants historiques valides : un créneau par minute à partir du 12 août 2025
+            day, minute = divmod(i, 24 * 60)
+            slot_id = f"slot_center-1_{date(2025, 8, 12) + timedelta(days=day):%Y%m%d}_{minute // 60:02d}{minute % 60:02d}"
+            t0 = time.perf_counter()
+            response = await client.post(
+                "/webhook/elevenlabs/center-1/book",
+                json={"slot_id": slot_id, "client_info": CLIENT_INFO}
+            )
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert "booking_id" in response.json(), response.text
+
+    # Attente de la livraison complète
+    t0 = time.perf_counter()
+    while (await booking_store.notification_counts()).get("pending"):
+        await asyncio.sleep(0.05)
+    drained = time.perf_counter() - t0
+    counts = await booking_store.notification_counts()
+    stats = notification_dispatcher.stats()
+    await notification_dispatcher.stop()
+    await booking_store.close()
+
+    expected = bookings * len(CHANNELS)
+    ok = len(provider.state.delivered) == expected and counts.get("sent") == expected
+    print(f"   webhook : {_percentiles(samples)}")
+    print(f"{'✅' if ok else '❌'} {len(provider.state.delivered)}/{expected} notifications livrées en {stats['batches']} lots "
+          f"({provider.state.calls} appels fournisseur, {stats['retried']} retentatives), outbox vidée {drained:.2f} s après la dernière réponse")
+    return ok
+
+
+def main(bookings: int, latency_ms: float, failure_rate: float) -> int:
+    latency = latency_ms / 1000
+    print(f"📊 {bookings} réservations, fournisseur {latency_ms:.0f} ms, {failure_rate:.0%} d'échecs (bases dans {_DB_DIR})")
+    print(f"Envoi en ligne : {_percentiles(asyncio.run(inline(bookings, latency)))}")
+    print("Outbox :")
+    return 0 if asyncio.run(outbox(bookings, latency, failure_rate)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 150,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+    ))
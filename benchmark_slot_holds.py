@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark : coût des blocages de créneaux selon le nombre de blocages actifs
+
+Compare, pour n blocages actifs, le tas de slot_holds.py à un balayage
+complet du dictionnaire des blocages (purge naïve) :
+
+- poser un blocage (avec purge des échéances passées)
+- test d'un créneau contre les blocages de son centre (filtrage des réponses get_slots)
+
+Usage : python benchmark_slot_holds.py [opérations]
+"""
+
+import sys
+import time
+
+from slot_holds import SlotHolds
+
+CENTERS = 50
+HOLD_SECONDS = 300.0
+
+
+def _filled(active: int) -> SlotHolds:
+    """n blocages actifs, échéances réparties sur HOLD_SECONDS"""
+    holds = SlotHolds(HOLD_SECONDS)
+    for i in range(active):
+        holds.hold(f"center-{i % CENTERS}", f"slot_{i}", f"conv-{i // 3}", now=i * HOLD_SECONDS / active)
+    return holds
+
+
+def _naive_sweep(expirations: dict, now: float) -> int:
+    expired = [key for key, expires_at in expirations.items() if expires_at <= now]
+    for key in expired:
+        del expirations[key]
+    return len(expired)
+
+
+def bench(active: int, operations: int) -> None:
+    holds = _filled(active)
+    now = HOLD_SECONDS  # Les premiers blocages arrivent à échéance
+    step = HOLD_SECONDS / active
+
+    # Pose + purge : une échéance passe à chaque nouveau blocage
+    t0 = time.perf_counter()
+    for i in range(operations):
+        now += step
+        holds.hold(f"center-{i % CENTERS}", f"new_{i}", f"caller-{i}", now=now)
+    heap_us = (time.perf_counter() - t0) / operations * 1e6
+
+    # Même charge avec un balayage complet à chaque opération
+    expirations = {(f"center-{i % CENTERS}", f"slot_{i}"): HOLD_SECONDS + i * step for i in range(active)}
+    naive_ops = max(1, min(operations, 200_000 // active))
+    now = HOLD_SECONDS
+    t0 = time.perf_counter()
+    for i in range(naive_ops):
+        now += step
+        _naive_sweep(expirations, now)
+        expirations[(f"center-{i % CENTERS}", f"new_{i}")] = now + HOLD_SECONDS
+    naive_us = (time.perf_counter() - t0) / naive_ops * 1e6
+
+    # Lecture des blocages d'un centre et test d'un créneau
+    t0 = time.perf_counter()
+    for i in range(operations):
+        held = holds.center_holds(f"center-{i % CENTERS}", now=now)
+        f"slot_{i}" in held
+    lookup_us = (time.perf_counter() - t0) / operations * 1e6
+
+    print(f"{active:>8} {heap_us:>12.2f} {naive_us:>14.2f} {lookup_us:>14.2f} {len(holds._heap):>10}")
+
+
+def main(operations: int) -> None:
+    print(f"📊 {operations} opérations par taille, {CENTERS} centres, blocages de {HOLD_SECONDS:.0f} s")
+    print(f"{'actifs':>8} {'tas µs/op':>12} {'balayage µs/op':>14} {'lecture µs/op':>14} {'tas':>10}")
+    for active in (1_000, 10_000, 100_000):
+        bench(active, operations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
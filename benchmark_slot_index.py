@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark : regroupement des créneaux par date et empreinte mémoire
+
+Compare l'ancien regroupement de get_slots_webhook (pour chaque créneau
+formaté, re-parcours de toute la liste et re-parsing du datetime) avec
+l'index construit en une seule passe (slot_index.SlotIndex) sur des
+SlotRecord déjà parsés à l'ingestion (parsing payé une fois par appel amont).
+
+Mesure aussi la mémoire retenue par 10 000 créneaux : un AvailableSlot
+pydantic par créneau vs le stockage colonnaire slot_store.SlotColumns.
+
+Usage : python benchmark_slot_index.py
+"""
+
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from backend_api import AvailableSlot
+from slot_index import PARIS_TZ, SlotIndex, SlotRecord
+from slot_store import SlotColumns
+
+
+def _make_slots(count: int):
+    """Créneaux de 30 minutes, 8h-18h, sur autant de jours que nécessaire"""
+    start = datetime(2025, 8, 4, 8, 0)
+    slots = []
+    for i in range(count):
+        day, rank = divmod(i, 20)
+        starts_at = start + timedelta(days=day, minutes=30 * rank)
+        slots.append(AvailableSlot(
+            slot_id=f"slot-{i}",
+            datetime=PARIS_TZ.localize(starts_at).isoformat(),
+            duration_minutes=50,
+            price=78
+        ))
+    return slots
+
+
+def _legacy_parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('+02:00', ''))
+
+
+def legacy_grouping(slots):
+    """Reproduction de l'ancien code : O(n²) et parsing répété"""
+    formatted_slots = [
+        {"id": slot.slot_id, "time_only": _legacy_parse(slot.datetime).strftime("%H:%M")}
+        for slot in slots
+    ]
+    slots_by_date = {}
+    for slot in formatted_slots:
+        for original_slot in slots:
+            if original_slot.slot_id == slot["id"]:
+                slot_date = _legacy_parse(original_slot.datetime).date()
+                slots_by_date.setdefault(slot_date, []).append(slot)
+                break
+    return slots_by_date
+
+
+def indexed_grouping(records):
+    index = SlotIndex(records, lambda slot: {"id": slot.slot_id, "time_only": slot.time_text})
+    return {day: index.day(day) for day in map(date.fromordinal, index.by_date)}
+
+
+def _time(fn, slots, budget: float = 0.5) -> float:
+    """Durée moyenne (ms) d'un appel, sur au moins un appel et ~budget secondes"""
+    runs = 0
+    t0 = time.perf_counter()
+    while True:
+        fn(slots)
+        runs += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= budget:
+            return elapsed / runs * 1000
+
+
+def _retained_kib(build) -> float:
+    """Mémoire retenue (Kio) par l'objet construit"""
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / 1024
+
+
+def memory_footprint(count: int = 10_000) -> None:
+    api_payload = [
+        {"id": slot.slot_id, "starts_at": slot.datetime, "price": slot.price, "is_available": True}
+        for slot in _make_slots(count)
+    ]
+    pydantic_kib = _retained_kib(lambda: [
+        AvailableSlot(slot_id=data["id"], datetime=data["starts_at"], duration_minutes=50, price=data["price"])
+        for data in api_payload
+    ])
+    columns_kib = _retained_kib(lambda: SlotColumns.from_api(api_payload))
+    print(f"\nMémoire pour {count} créneaux : AvailableSlot {pydantic_kib:.0f} Kio, SlotColumns {columns_kib:.0f} Kio")
+
+
+def main() -> None:
+    print(f"{'créneaux':>9} {'ancien (ms)':>13} {'index (ms)':>12} {'gain':>8}")
+    for count in (10, 100, 1_000, 10_000):
+        slots = _make_slots(count)
+        records = [SlotRecord(slot.slot_id, slot.datetime, slot.duration_minutes, slot.price) for slot in slots]
+        assert legacy_grouping(slots) == indexed_grouping(records)
+        legacy = _time(legacy_grouping, slots)
+        indexed = _time(indexed_grouping, records)
+        print(f"{count:>9} {legacy:>13.3f} {indexed:>12.3f} {legacy / indexed:>7.1f}x")
+    memory_footprint()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark : contexte temporel de l'agent (datetime_utils.format_current_context)
+
+Compare le rendu complet à chaque appel (contexte invalidé avant chaque
+appel, comme avant la mémorisation) au rendu depuis le contexte de la
+journée mémorisé (seules l'heure et les horodatages sont formatés), à
+horloge figée, et vérifie que les deux textes sont identiques.
+
+Usage : python benchmark_temporal_context.py [appels]
+"""
+
+import sys
+import time
+
+import datetime_utils
+from datetime_utils import format_current_context, get_conversation_metadata, invalidate_temporal_context
+
+
+def _per_call_us(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def uncached() -> str:
+    invalidate_temporal_context()
+    return format_current_context()
+
+
+def session_start() -> None:
+    """Contexte envoyé à l'ouverture d'une session WebSocket (un seul rendu, voir websocket_agent.py)"""
+    get_conversation_metadata()
+
+
+def main(calls: int) -> None:
+    # Horloge figée : les deux rendus doivent être identiques au caractère près
+    now = datetime_utils.get_paris_datetime()
+    datetime_utils.get_paris_datetime = lambda: now
+    assert uncached() == format_current_context()
+
+    full_us = _per_call_us(uncached, calls)
+    cached_us = _per_call_us(format_current_context, calls)
+    session_us = _per_call_us(session_start, calls)
+    stats = datetime_utils.temporal_context_cache
+
+    print(f"📊 {calls} appels de format_current_context")
+    print(f"Rendu complet     : {full_us:8.1f} µs/appel")
+    print(f"Contexte mémorisé : {cached_us:8.1f} µs/appel ({full_us / cached_us:.1f}x)")
+    print(f"Ouverture de session (métadonnées + contexte) : {session_us:.1f} µs")
+    print(f"Cache : {stats.hits} hits, {stats.misses} recalculs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
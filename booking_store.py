@@ -0,0 +1,419 @@
+"""
+Stockage durable des réservations (SQLite en mode WAL)
+
+Toutes les requêtes passent par un exécuteur dédié à un seul thread, propriétaire
+de la connexion : la boucle asyncio n'attend jamais le disque, et les écritures
+sont sérialisées sans verrou applicatif. Les requêtes sont des constantes
+(cache de requêtes préparées de sqlite3, paramètres liés).
+
+La contrainte UNIQUE (center_id, slot_id) garantit qu'un créneau n'est réservé
+qu'une fois, y compris entre plusieurs workers qui partagent le fichier.
+Identifiants : ULID (triables par date de création).
+
+Réservation transmise à Simplauto : enregistrée "pending" (le créneau est
+pris localement), puis confirmée avec l'identifiant Simplauto et ses
+notifications, ou supprimée si Simplauto refuse. Une réservation restée
+"pending" au-delà de BOOKING_PENDING_TIMEOUT (processus arrêté entre les
+deux, transmission interrompue jamais reprise) ne bloque plus le créneau.
+
+Table notification_outbox : notifications de confirmation (SMS, email,
+centre) insérées dans la même transaction que la réservation, envoyées ensuite
+par notifications.py. Une notification réclamée par un worker lui est louée
+(next_attempt_at repoussé) : elle revient d'elle-même si le worker disparaît.
+
+Table idempotency_keys : réponse du webhook /book par clé d'idempotence,
+pour qu'un appel rejoué renvoie la réponse d'origine sans rien réexécuter.
+Bornée en durée (ttl) et en nombre de clés (max_keys).
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id TEXT PRIMARY KEY,
+    center_id TEXT NOT NULL,
+    slot_id TEXT NOT NULL,
+    client_info TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    upstream_id TEXT,
+    UNIQUE (center_id, slot_id)
+)
+"""
+
+INSERT_BOOKING = (
+    "INSERT INTO bookings (id, center_id, slot_id, client_info, status, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+CONFIRM_BOOKING = "UPDATE bookings SET status = 'confirmed', upstream_id = ? WHERE id = ? AND status = 'pending'"
+DELETE_PENDING_BOOKING = "DELETE FROM bookings WHERE id = ? AND status = 'pending'"
+DELETE_STALE_PENDING = (
+    "DELETE FROM bookings WHERE center_id = ? AND slot_id = ? AND status = 'pending' AND created_at < ?"
+)
+
+IDEMPOTENCY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    center_id TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+IDEMPOTENCY_INDEX = "CREATE INDEX IF NOT EXISTS idempotency_keys_created_at ON idempotency_keys (created_at)"
+
+SELECT_IDEMPOTENT_RESPONSE = "SELECT response FROM idempotency_keys WHERE key = ? AND created_at >= ?"
+INSERT_IDEMPOTENT_RESPONSE = (
+    "INSERT OR IGNORE INTO idempotency_keys (key, center_id, response, created_at) VALUES (?, ?, ?, ?)"
+)
+DELETE_EXPIRED_KEYS = "DELETE FROM idempotency_keys WHERE created_at < ?"
+DELETE_OVERFLOW_KEYS = (
+    "DELETE FROM idempotency_keys WHERE key IN "
+    "(SELECT key FROM idempotency_keys ORDER BY created_at DESC LIMIT -1 OFFSET ?)"
+)
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+)
+"""
+OUTBOX_INDEX = "CREATE INDEX IF NOT EXISTS notification_outbox_due ON notification_outbox (status, next_attempt_at)"
+
+INSERT_NOTIFICATION = (
+    "INSERT INTO notification_outbox (booking_id, channel, payload, status, next_attempt_at, created_at) "
+    "VALUES (?, ?, ?, 'pending', ?, ?)"
+)
+SELECT_DUE_NOTIFICATIONS = (
+    "SELECT id, booking_id, channel, payload, attempts FROM notification_outbox "
+    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?"
+)
+LEASE_NOTIFICATION = "UPDATE notification_outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?"
+MARK_NOTIFICATION_SENT = "UPDATE notification_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?"
+MARK_NOTIFICATION_RETRY = "UPDATE notification_outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?"
+MARK_NOTIFICATION_FAILED = "UPDATE notification_outbox SET status = 'failed', last_error = ? WHERE id = ?"
+COUNT_NOTIFICATIONS = "SELECT status, COUNT(*) FROM notification_outbox GROUP BY status"
+
+SELECT_SLOT_BOOKING = (
+    "SELECT id, center_id, slot_id, client_info, status, created_at, upstream_id FROM bookings "
+    "WHERE center_id = ? AND slot_id = ?"
+)
+SELECT_CENTER_BOOKINGS = (
+    "SELECT id, center_id, slot_id, client_info, status, created_at, upstream_id FROM bookings "
+    "WHERE center_id = ? ORDER BY id"
+)
+
+
+def new_ulid() -> str:
+    """ULID : 48 bits d'horodatage (ms) + 80 bits aléatoires, en base32 Crockford"""
+    value = (int(time.time() * 1000) << 80) | secrets.randbits(80)
+    chars = []
+    for _ in range(26):
+        value, index = divmod(value, 32)
+        chars.append(_CROCKFORD[index])
+    return "".join(reversed(chars))
+
+
+class SlotAlreadyBooked(Exception):
+    """Le créneau a déjà été réservé (contrainte UNIQUE center_id, slot_id)"""
+
+    def __init__(self, center_id: str, slot_id: str):
+        super().__init__(f"Créneau {slot_id} déjà réservé pour le centre {center_id}")
+        self.center_id = center_id
+        self.slot_id = slot_id
+
+
+def _row_to_booking(row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    booking_id, center_id, slot_id, client_info, status, created_at, upstream_id = row
+    return {
+        "id": booking_id,
+        "center_id": center_id,
+        "slot_id": slot_id,
+        "client_info": json.loads(client_info),
+        "status": status,
+        "created_at": created_at,
+        "upstream_id": upstream_id
+    }
+
+
+class BookingRepository:
+    """Réservations persistantes, accès asynchrone via un thread dédié"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BOOKING_DB_PATH", "bookings.db")
+        self.pending_timeout = float(os.getenv("BOOKING_PENDING_TIMEOUT", "120"))
+        self.idempotency_ttl = float(os.getenv("BOOKING_IDEMPOTENCY_TTL", "86400"))
+        self.idempotency_max_keys = int(os.getenv("BOOKING_IDEMPOTENCY_MAX_KEYS", "10000"))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-db")
+        self._connection: Optional[sqlite3.Connection] = None
+
+        # Compteurs
+        self.idempotent_replays = 0
+
+    # --- Thread de la base ---------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connexion du thread dédié (créée au premier appel)"""
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=float(os.getenv("BOOKING_DB_BUSY_TIMEOUT", "5")),
+                check_same_thread=False,  # Utilisée uniquement par le thread de l'exécuteur
+                isolation_level=None,  # Transactions explicites
+                cached_statements=64
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(bookings)")}
+            if "upstream_id" not in columns:
+                connection.execute("ALTER TABLE bookings ADD COLUMN upstream_id TEXT")
+            connection.execute(OUTBOX_SCHEMA)
+            connection.execute(OUTBOX_INDEX)
+            connection.execute(IDEMPOTENCY_SCHEMA)
+            connection.execute(IDEMPOTENCY_INDEX)
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connect()))
+
+    # --- Réservations --------------------------------------------------------
+
+    async def create_booking(
+        self,
+        center_id: str,
+        slot_id: str,
+        client_info: Dict[str, Any],
+        notifications: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+        status: str = "confirmed"
+    ) -> Dict[str, Any]:
+        """
+        Enregistre une réservation confirmée (ou "pending" avant transmission à Simplauto)
+
+        Les notifications (canal, contenu) sont ajoutées à l'outbox dans la même
+        transaction : validée, la réservation a forcément ses notifications.
+
+        Raises:
+            SlotAlreadyBooked: le créneau est déjà réservé pour ce centre
+        """
+        created_at = datetime.now()
+        booking = {
+            "id": f"booking_{new_ulid()}",
+            "center_id": center_id,
+            "slot_id": slot_id,
+            "client_info": client_info,
+            "status": status,
+            "created_at": created_at.isoformat(),
+            "upstream_id": None
+        }
+        stale_before = (created_at - timedelta(seconds=self.pending_timeout)).isoformat()
+        params = (
+            booking["id"], center_id, slot_id,
+            json.dumps(client_info, ensure_ascii=False), booking["status"], booking["created_at"]
+        )
+
+        now = time.time()
+        outbox_rows = [
+            (booking["id"], channel, json.dumps(payload, ensure_ascii=False), now, now)
+            for channel, payload in notifications or ()
+        ]
+
+        def insert(connection: sqlite3.Connection) -> None:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                try:
+                    connection.execute(INSERT_BOOKING, params)
+                except sqlite3.IntegrityError:
+                    # Réservation "pending" abandonnée : le créneau est libéré
+                    if not connection.execute(DELETE_STALE_PENDING, (center_id, slot_id, stale_before)).rowcount:
+                        raise
+                    connection.execute(INSERT_BOOKING, params)
+                connection.executemany(INSERT_NOTIFICATION, outbox_rows)
+                connection.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                connection.execute("ROLLBACK")
+                raise SlotAlreadyBooked(center_id, slot_id)
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        await self._run(insert)
+        return booking
+
+    async def confirm_booking(
+        self,
+        booking: Dict[str, Any],
+        upstream_id: Optional[str],
+        notifications: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
+        """Confirme une réservation "pending" acceptée par Simplauto, avec ses notifications"""
+        now = time.time()
+        outbox_rows = [
+            (booking["id"], channel, json.dumps(payload, ensure_ascii=False), now, now)
+            for channel, payload in notifications or ()
+        ]
+
+        def confirm(connection: sqlite3.Connection) -> None:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Déjà confirmée (reprise concurrente) : ses notifications sont déjà dans l'outbox
+                if connection.execute(CONFIRM_BOOKING, (upstream_id, booking["id"])).rowcount:
+                    connection.executemany(INSERT_NOTIFICATION, outbox_rows)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        await self._run(confirm)
+        return {**booking, "status": "confirmed", "upstream_id": upstream_id}
+
+    async def cancel_pending_booking(self, booking_id: str) -> bool:
+        """Supprime une réservation "pending" refusée par Simplauto (le créneau est libéré)"""
+        return await self._run(
+            lambda connection: connection.execute(DELETE_PENDING_BOOKING, (booking_id,)).rowcount > 0
+        )
+
+    async def get_slot_booking(self, center_id: str, slot_id: str) -> Optional[Dict[str, Any]]:
+        """Réservation existante d'un créneau, None si libre"""
+        return await self._run(lambda connection: _row_to_booking(
+            connection.execute(SELECT_SLOT_BOOKING, (center_id, slot_id)).fetchone()
+        ))
+
+    async def list_bookings(self, center_id: str) -> List[Dict[str, Any]]:
+        return await self._run(lambda connection: [
+            _row_to_booking(row) for row in connection.execute(SELECT_CENTER_BOOKINGS, (center_id,))
+        ])
+
+    # --- Outbox des notifications -------------------------------------------
+
+    async def claim_notifications(self, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """Réclame les notifications dues, louées `lease_seconds` au worker appelant"""
+        def claim(connection: sqlite3.Connection) -> List[Dict[str, Any]]:
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(SELECT_DUE_NOTIFICATIONS, (now, limit)).fetchall()
+                connection.executemany(LEASE_NOTIFICATION, [(now + lease_seconds, row[0]) for row in rows])
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            return [
+                {
+                    "id": notification_id,
+                    "booking_id": booking_id,
+                    "channel": channel,
+                    "payload": json.loads(payload),
+                    "attempts": attempts + 1
+                }
+                for notification_id, booking_id, channel, payload, attempts in rows
+            ]
+
+        return await self._run(claim)
+
+    async def complete_notifications(
+        self,
+        sent: List[int],
+        retries: List[Tuple[int, float, str]],
+        failures: List[Tuple[int, str]]
+    ) -> None:
+        """Enregistre le résultat d'un lot : envoyées, à retenter (id, échéance, erreur), abandonnées (id, erreur)"""
+        def complete(connection: sqlite3.Connection) -> None:
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(MARK_NOTIFICATION_SENT, [(now, notification_id) for notification_id in sent])
+                connection.executemany(MARK_NOTIFICATION_RETRY, [
+                    (next_attempt_at, error, notification_id) for notification_id, next_attempt_at, error in retries
+                ])
+                connection.executemany(MARK_NOTIFICATION_FAILED, [
+                    (error, notification_id) for notification_id, error in failures
+                ])
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        await self._run(complete)
+
+    async def notification_counts(self) -> Dict[str, int]:
+        """Nombre de notifications par statut (pending, sent, failed)"""
+        return await self._run(lambda connection: dict(connection.execute(COUNT_NOTIFICATIONS).fetchall()))
+
+    # --- Idempotence ---------------------------------------------------------
+
+    async def get_idempotent_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Réponse enregistrée pour cette clé, None si inconnue ou expirée"""
+        min_created_at = time.time() - self.idempotency_ttl
+
+        def select(connection: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = connection.execute(SELECT_IDEMPOTENT_RESPONSE, (key, min_created_at)).fetchone()
+            return json.loads(row[0]) if row else None
+
+        response = await self._run(select)
+        if response is not None:
+            self.idempotent_replays += 1
+        return response
+
+    async def save_idempotent_response(self, key: str, center_id: str, response: Dict[str, Any]) -> None:
+        """Enregistre la réponse d'une clé (la première enregistrée est conservée) et purge la table"""
+        now = time.time()
+        params = (key, center_id, json.dumps(response, ensure_ascii=False), now)
+
+        def insert(connection: sqlite3.Connection) -> None:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(INSERT_IDEMPOTENT_RESPONSE, params)
+                connection.execute(DELETE_EXPIRED_KEYS, (now - self.idempotency_ttl,))
+                connection.execute(DELETE_OVERFLOW_KEYS, (self.idempotency_max_keys,))
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        await self._run(insert)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "idempotent_replays": self.idempotent_replays,
+            "idempotency_ttl": self.idempotency_ttl,
+            "idempotency_max_keys": self.idempotency_max_keys
+        }
+
+    async def close(self) -> None:
+        """Ferme la connexion (dans son thread) et arrête l'exécuteur"""
+        def close_connection(_):
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        if self._connection is not None:
+            await self._run(close_connection)
+        self._executor.shutdown(wait=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-db")
+
+
+# Instance partagée par l'application
+booking_store = BookingRepository()
@@ -0,0 +1,176 @@
+"""
+Disjoncteur (circuit breaker) pour les appels amont
+
+Chaque appel est borné par un budget de latence compatible avec un tour de
+parole. Les derniers appels sont gardés dans une fenêtre glissante : un appel
+en erreur, hors budget ou plus lent que slow_call_threshold compte comme un
+échec. Au-delà de failure_rate_threshold, le circuit s'ouvre et les appels
+échouent immédiatement (CircuitOpenError) pendant open_seconds, puis un seul
+appel d'essai (semi-ouvert) décide de la fermeture ou d'une nouvelle ouverture.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé : le circuit est ouvert"""
+
+
+class CircuitBreaker:
+    """Disjoncteur à fenêtre glissante avec seuils d'erreur et de latence"""
+
+    def __init__(
+        self,
+        name: str,
+        latency_budget: float = 2.5,
+        slow_call_threshold: float = 1.5,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 15.0
+    ):
+        self.name = name
+        self.latency_budget = latency_budget
+        self.slow_call_threshold = slow_call_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        # True = échec (erreur ou lenteur), False = succès
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+
+        # Compteurs
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """État courant (l'ouverture expire en semi-ouvert après open_seconds)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def failure_rate(self) -> float:
+        """Taux d'échec sur la fenêtre glissante"""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        bounded: bool = True,
+        is_failure: Optional[Callable[[Exception], bool]] = None
+    ) -> Any:
+        """
+        Exécute fn sous le disjoncteur
+
+        Args:
+            bounded: appel coupé au-delà du budget de latence (False pour une
+                     écriture, qui pourrait avoir abouti côté amont)
+            is_failure: exceptions comptées comme échecs de l'amont (toutes par
+                        défaut) ; les autres, réponses métier, comptent comme succès
+
+        Raises:
+            CircuitOpenError: circuit ouvert, ou essai semi-ouvert déjà en cours
+            asyncio.TimeoutError: budget de latence dépassé
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probe_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit {self.name} ouvert")
+
+        probe = state == HALF_OPEN
+        if probe:
+            self._probe_in_flight = True
+
+        self.calls += 1
+        started = time.monotonic()
+        try:
+            if bounded:
+                result = await asyncio.wait_for(fn(), timeout=self.latency_budget)
+            else:
+                result = await fn()
+        except asyncio.CancelledError:
+            # Appelant annulé : ni succès ni échec de l'amont
+            if probe:
+                self._probe_in_flight = False
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            self._record(failed=is_failure is None or is_failure(e), probe=probe)
+            raise
+
+        slow = time.monotonic() - started > self.slow_call_threshold
+        if slow:
+            self.slow_calls += 1
+        self._record(failed=slow, probe=probe)
+        return result
+
+    def _record(self, failed: bool, probe: bool) -> None:
+        if failed:
+            self.failures += 1
+
+        if probe:
+            self._probe_in_flight = False
+            if failed:
+                self._open()
+            else:
+                # Essai réussi : on repart d'une fenêtre vide
+                self._state = CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append(failed)
+        if (
+            self._state == CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        print(f"⚠️ Circuit {self.name} ouvert pour {self.open_seconds:.0f}s (taux d'échec {self.failure_rate():.0%})")
+
+    def reset(self) -> None:
+        """Referme le circuit et vide la fenêtre (tests)"""
+        self._state = CLOSED
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """État et compteurs du disjoncteur"""
+        opened_for: Optional[float] = None
+        if self.state == OPEN:
+            opened_for = round(time.monotonic() - self._opened_at, 3)
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "opened_for_seconds": opened_for,
+            "latency_budget_seconds": self.latency_budget
+        }
@@ -1,59 +1,73 @@
 from datetime import datetime, timedelta
 import pytz
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from french_dates import day_name, format_full_date, format_month_date, format_time
 
 def get_paris_datetime() -> datetime:
     """Retourne la date et heure actuelle à Paris"""
     paris_tz = pytz.timezone('Europe/Paris')
     return datetime.now(paris_tz)
 
-def format_current_context() -> str:
-    """Formate le contexte temporel complet pour l'agent"""
-    now = get_paris_datetime()
-    
-    # Calcul des dates de référence
-    yesterday = now - timedelta(days=1)
-    day_before_yesterday = now - timedelta(days=2)
-    tomorrow = now + timedelta(days=1)
-    day_after_tomorrow = now + timedelta(days=2)
-    
-    # Calcul du prochain lundi (semaine prochaine)
-    days_until_next_monday = (7 - now.weekday()) % 7
-    if days_until_next_monday == 0:  # Si c'est lundi, prendre le lundi suivant
-        days_until_next_monday = 7
-    next_monday = now + timedelta(days=days_until_next_monday)
+class TemporalContext:
+    """
+    Contexte temporel d'une journée : tout le texte qui ne dépend que de la date
+    est rendu une fois, seuls l'heure (ligne MAINTENANT) et les horodatages
+    ISO / Unix sont formatés à chaque appel
+    """
     
-    # Dans 2 semaines = lundi suivant le prochain lundi
-    monday_in_2_weeks = next_monday + timedelta(weeks=1)
+    __slots__ = ("day", "today_text", "head", "body", "middle", "tail")
     
-    # Mois prochain (du 1er au dernier jour)
-    if now.month == 12:
-        next_month_start = now.replace(year=now.year + 1, month=1, day=1)
-        next_month_end = now.replace(year=now.year + 1, month=1, day=31)
-    else:
-        next_month_start = now.replace(month=now.month + 1, day=1)
-        # Dernier jour du mois prochain
-        if now.month + 1 == 12:
-            next_month_end = now.replace(year=now.year + 1, month=1, day=1) - timedelta(days=1)
+    def __init__(self, now: datetime):
+        self.day = now.date()
+        
+        # Calcul des dates de référence
+        yesterday = now - timedelta(days=1)
+        day_before_yesterday = now - timedelta(days=2)
+        tomorrow = now + timedelta(days=1)
+        day_after_tomorrow = now + timedelta(days=2)
+        
+        # Calcul du prochain lundi (semaine prochaine)
+        days_until_next_monday = (7 - now.weekday()) % 7
+        if days_until_next_monday == 0:  # Si c'est lundi, prendre le lundi suivant
+            days_until_next_monday = 7
+        next_monday = now + timedelta(days=days_until_next_monday)
+        
+        # Dans 2 semaines = lundi suivant le prochain lundi
+        monday_in_2_weeks = next_monday + timedelta(weeks=1)
+        
+        # Mois prochain (du 1er au dernier jour)
+        if now.month == 12:
+            next_month_start = now.replace(year=now.year + 1, month=1, day=1)
+            next_month_end = now.replace(year=now.year + 1, month=1, day=31)
         else:
-            next_month_end = now.replace(month=now.month + 2, day=1) - timedelta(days=1)
-    
-    context = f"""
+            next_month_start = now.replace(month=now.month + 1, day=1)
+            # Dernier jour du mois prochain
+            if now.month + 1 == 12:
+                next_month_end = now.replace(year=now.year + 1, month=1, day=1) - timedelta(days=1)
+            else:
+                next_month_end = now.replace(month=now.month + 2, day=1) - timedelta(days=1)
+        
+        today_text = format_full_date(now)
+        self.today_text = today_text
+        
+        self.head = """
 CONTEXTE TEMPOREL ACTUEL (Heure de Paris, France) :
 
-📅 MAINTENANT : {now.strftime('%A %d %B %Y à %H:%M')} (UTC+{now.strftime('%z')[1:3]}:{now.strftime('%z')[3:5]})
+📅 MAINTENANT : """
+        
+        self.body = f"""
 
 📋 DATES DE RÉFÉRENCE :
-• Avant-hier : {day_before_yesterday.strftime('%A %d %B %Y')}
-• Hier : {yesterday.strftime('%A %d %B %Y')}
-• Aujourd'hui : {now.strftime('%A %d %B %Y')}
-• Ce matin : {now.strftime('%A %d %B %Y')} matin (08h00-12h00)
-• Cet après-midi : {now.strftime('%A %d %B %Y')} après-midi (13h00-18h00)
-• Demain : {tomorrow.strftime('%A %d %B %Y')}
-• Après-demain : {day_after_tomorrow.strftime('%A %d %B %Y')}
-• La semaine prochaine : du {next_monday.strftime('%A %d %B %Y')} au {(next_monday + timedelta(days=6)).strftime('%A %d %B %Y')}
-• Dans 2 semaines : du {monday_in_2_weeks.strftime('%A %d %B %Y')} au {(monday_in_2_weeks + timedelta(days=6)).strftime('%A %d %B %Y')}
-• Le mois prochain : du {next_month_start.strftime('%d %B %Y')} au {next_month_end.strftime('%d %B %Y')}
+• Avant-hier : {format_full_date(day_before_yesterday)}
+• Hier : {format_full_date(yesterday)}
+• Aujourd'hui : {today_text}
+• Ce matin : {today_text} matin (08h00-12h00)
+• Cet après-midi : {today_text} après-midi (13h00-18h00)
+• Demain : {format_full_date(tomorrow)}
+• Après-demain : {format_full_date(day_after_tomorrow)}
+• La semaine prochaine : du {format_full_date(next_monday)} au {format_full_date(next_monday + timedelta(days=6))}
+• Dans 2 semaines : du {format_full_date(monday_in_2_weeks)} au {format_full_date(monday_in_2_weeks + timedelta(days=6))}
+• Le mois prochain : du {format_month_date(next_month_start)} au {format_month_date(next_month_end)}
 
 ⏰ POUR LES CRÉNEAUX HORAIRES :
 • Matin : 08h00-12h00
@@ -62,13 +76,61 @@ CONTEXTE TEMPOREL ACTUEL (Heure de Paris, France) :
 
 🗓️ FORMATS À UTILISER POUR L'API :
 • Date ISO : {now.strftime('%Y-%m-%d')}
-• DateTime ISO : {now.isoformat()}
-• Timestamp Unix : {int(now.timestamp())}
+• DateTime ISO : """
+        
+        self.middle = """
+• Timestamp Unix : """
+        
+        self.tail = """
 
 IMPORTANT : Utilisez ces informations pour interpréter correctement les demandes temporelles des utilisateurs et interroger l'API de réservation avec les bonnes dates.
 """
     
-    return context
+    def render(self, now: datetime) -> str:
+        """Contexte complet pour l'instant `now` (même journée)"""
+        offset = now.strftime('%z')
+        return "".join((
+            self.head,
+            f"{self.today_text} à {format_time(now)} (UTC+{offset[1:3]}:{offset[3:5]})",
+            self.body,
+            now.isoformat(),
+            self.middle,
+            str(int(now.timestamp())),
+            self.tail
+        ))
+
+class TemporalContextCache:
+    """Contexte temporel de la journée en cours (recalculé au changement de date à Paris)"""
+    
+    def __init__(self):
+        self._context: Optional[TemporalContext] = None
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, now: datetime) -> TemporalContext:
+        context = self._context
+        if context is None or context.day != now.date():
+            context = self._context = TemporalContext(now)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return context
+    
+    def invalidate(self) -> None:
+        """Oublie le contexte mémorisé (tests, changement d'horloge)"""
+        self._context = None
+
+# Instance partagée (voir invalidate_temporal_context)
+temporal_context_cache = TemporalContextCache()
+
+def invalidate_temporal_context() -> None:
+    """Force le recalcul du contexte temporel au prochain appel"""
+    temporal_context_cache.invalidate()
+
+def format_current_context() -> str:
+    """Formate le contexte temporel complet pour l'agent (parties du jour mémorisées jusqu'à minuit)"""
+    now = get_paris_datetime()
+    return temporal_context_cache.get(now).render(now)
 
 def get_conversation_metadata() -> Dict[str, Any]:
     """Retourne les métadonnées de conversation avec contexte temporel"""
@@ -80,8 +142,8 @@ def get_conversation_metadata() -> Dict[str, Any]:
         "locale": "fr-FR",
         "current_date": now.strftime('%Y-%m-%d'),
         "current_time": now.strftime('%H:%M:%S'),
-        "day_of_week": now.strftime('%A'),
-        "context": format_current_context()
+        "day_of_week": day_name(now),
+        "context": temporal_context_cache.get(now).render(now)
     }
 
 def calculate_relative_date(reference: str) -> str:
@@ -1,3 +1,4 @@
+import os
 import httpx
 import asyncio
 from typing import Dict, Any, Optional
@@ -6,9 +7,10 @@ from prompt_generator import PromptGenerator
 class ElevenLabsIntegration:
     """Gestionnaire d'intégration avec ElevenLabs pour centres de contrôle technique"""
     
-    def __init__(self, api_key: str, base_url: str = "https://api.elevenlabs.io"):
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
         self.api_key = api_key
-        self.base_url = base_url
+        # Injectable (ELEVENLABS_BASE_URL) pour les essais hors ligne, voir standin_servers.py
+        self.base_url = (base_url or os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")).rstrip("/")
         self.headers = {
             "xi-api-key": api_key,
             "Content-Type": "application/json"
@@ -156,6 +158,12 @@ class ElevenLabsIntegration:
         if not webhook_base_url:
             webhook_base_url = "https://votre-api.com"  # À remplacer
         
+        # Créneaux proposés bloqués par conversation (voir slot_holds.py)
+        conversation_id = {
+            "type": "string",
+            "description": "Identifiant de la conversation en cours : {{system__conversation_id}}"
+        }
+        
         return [
             {
                 "name": "get_slots",
@@ -186,9 +194,10 @@ class ElevenLabsIntegration:
                             "type": "string",
                             "enum": ["morning", "afternoon", "any"],
                             "description": "Créneau préféré"
-                        }
+                        },
+                        "conversation_id": conversation_id
                     },
-                    "required": ["start_date", "vehicle_type"]
+                    "required": ["start_date", "vehicle_type", "conversation_id"]
                 }
             },
             {
@@ -217,9 +226,48 @@ class ElevenLabsIntegration:
                                 "license_plate": {"type": "string"}
                             },
                             "required": ["first_name", "last_name", "phone", "vehicle_brand", "license_plate"]
-                        }
+                        },
+                        "conversation_id": conversation_id
+                    },
+                    "required": ["slot_id", "client_info", "conversation_id"]
+                }
+            },
+            {
+                "name": "hold",
+                "description": "Garde quelques minutes le créneau choisi par le client, le temps de prendre ses informations",
+                "webhook": {
+                    "url": f"{webhook_base_url}/webhook/elevenlabs/{center_id}/hold",
+                    "method": "POST"
+                },
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "slot_id": {
+                            "type": "string",
+                            "description": "ID du créneau choisi"
+                        },
+                        "conversation_id": conversation_id
+                    },
+                    "required": ["slot_id", "conversation_id"]
+                }
+            },
+            {
+                "name": "release",
+                "description": "Libère les créneaux gardés pour le client (il renonce ou raccroche)",
+                "webhook": {
+                    "url": f"{webhook_base_url}/webhook/elevenlabs/{center_id}/release",
+                    "method": "POST"
+                },
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "slot_id": {
+                            "type": "string",
+                            "description": "ID du créneau à libérer (tous si absent)"
+                        },
+                        "conversation_id": conversation_id
                     },
-                    "required": ["slot_id", "client_info"]
+                    "required": ["conversation_id"]
                 }
             }
         ]
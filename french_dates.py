@@ -0,0 +1,180 @@
+"""
+Tables et phrases de dates en français pour les réponses de l'agent
+
+Les noms de jours et de mois sont des tables constantes. Les fonctions
+format_* remplacent strftime("%A %d %B %Y") et consorts : strftime suit la
+locale du processus (noms anglais dans un conteneur en locale C) et
+setlocale est global au processus, donc inutilisable pendant des requêtes
+concurrentes. Elles ne lisent que ces tables (résultat identique quelle que
+soit la locale, et plus rapide que strftime) et sont partagées par
+datetime_utils, prompt_generator et les webhooks.
+
+Les phrases qui dépendent d'une date et du jour courant (label relatif,
+affichage du jour, affichage des demi-journées) sont mémorisées par
+DatePhraseCache et invalidées au changement de date à Paris (minuit).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Union
+
+DAY_NAMES = ("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche")
+MONTH_NAMES = (
+    "", "janvier", "février", "mars", "avril", "mai", "juin",
+    "juillet", "août", "septembre", "octobre", "novembre", "décembre"
+)
+
+# Tables inverses pour l'analyse des expressions ("lundi" → 0, "août" → 8)
+DAY_NUMBERS = {name: weekday for weekday, name in enumerate(DAY_NAMES)}
+MONTH_NUMBERS = {name: month for month, name in enumerate(MONTH_NAMES) if name}
+
+NEAR_DAY_LABELS = ("aujourd'hui", "demain", "après-demain")
+
+# Nombres déjà convertis en texte (jours du mois, heures et minutes sur deux chiffres)
+_NUMBERS = tuple(str(number) for number in range(32))
+_TWO_DIGITS = tuple(f"{number:02d}" for number in range(60))
+
+
+# --- Formatage (indépendant de la locale) ----------------------------------------
+
+def day_name(day: Union[date, datetime]) -> str:
+    """Nom du jour, ex. lundi (%A)"""
+    return DAY_NAMES[day.weekday()]
+
+
+def format_day_month(day: Union[date, datetime]) -> str:
+    """Jour et mois, ex. 11 août"""
+    return f"{_NUMBERS[day.day]} {MONTH_NAMES[day.month]}"
+
+
+def format_date(day: Union[date, datetime]) -> str:
+    """Jour de la semaine, jour et mois, ex. lundi 11 août"""
+    return f"{DAY_NAMES[day.weekday()]} {_NUMBERS[day.day]} {MONTH_NAMES[day.month]}"
+
+
+def format_full_date(day: Union[date, datetime]) -> str:
+    """Date complète, ex. lundi 11 août 2025 (%A %d %B %Y, jour sans zéro initial)"""
+    return f"{DAY_NAMES[day.weekday()]} {_NUMBERS[day.day]} {MONTH_NAMES[day.month]} {day.year}"
+
+
+def format_month_date(day: Union[date, datetime]) -> str:
+    """Jour, mois et année, ex. 11 août 2025 (%d %B %Y)"""
+    return f"{_NUMBERS[day.day]} {MONTH_NAMES[day.month]} {day.year}"
+
+
+def format_time(moment: datetime) -> str:
+    """Heure, ex. 09:30 (%H:%M)"""
+    return f"{_TWO_DIGITS[moment.hour]}:{_TWO_DIGITS[moment.minute]}"
+
+
+def format_datetime(moment: datetime) -> str:
+    """Date et heure, ex. lundi 11 août 2025 à 09:30"""
+    return f"{format_full_date(moment)} à {_TWO_DIGITS[moment.hour]}:{_TWO_DIGITS[moment.minute]}"
+
+
+def get_relative_label(slot_date: date, today: date) -> Optional[str]:
+    """Calcule le label relatif pour une date ("demain", "ce jeudi", "lundi prochain"...)"""
+    delta = (slot_date - today).days
+    slot_weekday = slot_date.weekday()
+    today_weekday = today.weekday()
+
+    # Cas spéciaux : aujourd'hui, demain, après-demain
+    if 0 <= delta <= 2:
+        return NEAR_DAY_LABELS[delta]
+
+    # Semaine prochaine : du lundi prochain au dimanche prochain
+    if today_weekday == 6:  # Si on est dimanche
+        days_until_next_monday = 1
+    else:  # Sinon, jours jusqu'au lundi suivant
+        days_until_next_monday = 7 - today_weekday
+
+    next_monday = today + timedelta(days=days_until_next_monday)
+    next_sunday = next_monday + timedelta(days=6)
+
+    if next_monday <= slot_date <= next_sunday:
+        return f"{DAY_NAMES[slot_weekday]} prochain"
+
+    # Si c'est dans la semaine courante mais après après-demain
+    if 2 < delta <= 7:
+        this_week_end = today + timedelta(days=(6 - today_weekday))  # Dimanche de cette semaine
+        if slot_date <= this_week_end:
+            return f"ce {DAY_NAMES[slot_weekday]}"  # "ce jeudi", "ce vendredi"
+        return f"{DAY_NAMES[slot_weekday]} prochain"
+
+    return None
+
+
+class DayPhrases:
+    """Phrases précalculées pour une date, relativement à aujourd'hui"""
+
+    __slots__ = (
+        "relative_label", "day_name", "date_only", "day_display", "half_day_phrases"
+    )
+
+    def __init__(self, day: date, today: date):
+        relative_label = get_relative_label(day, today)
+
+        self.relative_label = relative_label
+        self.day_name = day_name(day)
+        # "lundi 11 août"
+        self.date_only = format_date(day)
+
+        if relative_label in NEAR_DAY_LABELS:
+            self.day_display = f"{relative_label} ({self.date_only})"
+        elif relative_label:
+            self.day_display = f"{relative_label} ({format_day_month(day)})"
+        else:
+            self.day_display = self.date_only
+
+        self.half_day_phrases = {
+            period: self._half_day_phrase(period)
+            for period in ("matin", "après-midi")
+        }
+
+    def _half_day_phrase(self, period: str) -> str:
+        """Demi-journée à prononcer ("demain matin", "cet après-midi", "lundi matin prochain"...)"""
+        relative_label = self.relative_label
+        if relative_label == "aujourd'hui":
+            return "ce matin" if period == "matin" else "cet après-midi"
+        if relative_label in ("demain", "après-demain"):
+            return f"{relative_label} {period}"
+        if relative_label and relative_label.endswith(" prochain"):
+            return f"{relative_label[:-len(' prochain')]} {period} prochain"
+        if relative_label and relative_label.startswith("ce "):
+            return f"{relative_label} {period}"
+        return f"{self.day_display} {period}"
+
+    def half_day(self, period: str) -> str:
+        phrase = self.half_day_phrases.get(period)
+        return phrase if phrase is not None else f"{self.day_display} {period}"
+
+
+class DatePhraseCache:
+    """Mémoïsation des DayPhrases pour le jour courant (vidée à minuit, heure de Paris)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._today: Optional[date] = None
+        self._phrases: Dict[int, DayPhrases] = {}
+
+    def get(self, day: date, today: date) -> DayPhrases:
+        """Phrases de `day` vues depuis `today`"""
+        if today != self._today:
+            self._today = today
+            self._phrases.clear()
+
+        key = day.toordinal()
+        phrases = self._phrases.get(key)
+        if phrases is None:
+            if len(self._phrases) >= self.max_entries:
+                self._phrases.clear()
+            phrases = self._phrases[key] = DayPhrases(day, today)
+        return phrases
+
+    def invalidate(self) -> None:
+        """Vide le cache (tests)"""
+        self._today = None
+        self._phrases.clear()
+
+
+# Instance partagée
+date_phrases = DatePhraseCache()
@@ -0,0 +1,117 @@
+"""
+Requêtes doublées (hedging) pour réduire la latence de queue des appels amont
+
+Si la première requête n'a pas répondu après un délai égal à un centile des
+latences observées, une seconde requête identique est envoyée et la première
+réponse arrivée l'emporte (l'autre est annulée). Le nombre de doublages est
+plafonné à une fraction des requêtes pour ne pas doubler la charge quand
+l'amont ralentit pour tout le monde.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+class Hedger:
+    """Doublage des requêtes lentes, avec délai au centile et taux plafonné"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        initial_delay: float = 0.3,
+        max_rate: float = 0.1,
+        min_samples: int = 20,
+        window_size: int = 200
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        # Latences (secondes) des dernières requêtes réussies ou abandonnées
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+
+        # Compteurs
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+        self.capped = 0
+
+    def delay(self) -> float:
+        """Délai avant doublage : centile des latences récentes (initial_delay au démarrage)"""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        samples = sorted(self._latencies)
+        rank = round(self.percentile / 100 * (len(samples) - 1))
+        return samples[min(rank, len(samples) - 1)]
+
+    async def _timed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Requête perdante : son attente est un minorant de sa latence,
+            # la garder évite de tirer le centile vers le bas
+            self._latencies.append(time.monotonic() - started)
+            raise
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute fn, doublée si la réponse tarde
+
+        fn doit être idempotente (lecture) : elle peut être appelée deux fois.
+        Si les deux requêtes échouent, l'erreur de la première est levée.
+        """
+        self.requests += 1
+        if not self.enabled:
+            return await self._timed(fn)
+
+        primary = asyncio.create_task(self._timed(fn))
+        hedge: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay())
+            if done:
+                return primary.result()
+
+            if self.fired >= self.max_rate * self.requests:
+                # Plafond atteint : on attend la première requête
+                self.capped += 1
+                return await primary
+
+            self.fired += 1
+            hedge = asyncio.create_task(self._timed(fn))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.won += 1
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Erreur de la requête perdante : marquée comme lue
+                    task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de doublage"""
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedges_fired": self.fired,
+            "hedges_won": self.won,
+            "hedges_capped": self.capped,
+            "hedge_rate": round(self.fired / self.requests, 4) if self.requests else 0.0,
+            "delay_seconds": round(self.delay(), 4)
+        }
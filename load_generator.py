@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge : N conversations téléphoniques simultanées
+
+Chaque conversation suit le déroulé imposé à l'agent par prompt_generator.py,
+avec des temps de réflexion réalistes entre les appels d'outils (réponse de
+l'agent prononcée, réponse du client, collecte des coordonnées avant book) :
+
+1. get_slots                         (première demande)
+2. get_slots avec specific_day       ("lundi", "lundi suivant", "11 août"...)
+3. get_slots avec specific_day et period
+4. book sur la première heure annoncée
+
+Cibles :
+
+- par défaut, dans le processus : backend_api via le transport ASGI de httpx,
+  Simplauto remplacé par standin_servers.py (aucun réseau, base temporaire)
+- --url : un backend déployé (ex. une instance Railway) ; l'étape book
+  suppose des identifiants de créneaux du serveur de remplacement
+  (SIMPLAUTO_BASE_URL du backend pointé sur standin_servers.py), sinon --no-book
+
+Rejeu : --replay fichier.jsonl rejoue des appels d'outils enregistrés, une
+ligne JSON par appel :
+
+    {"conversation_id": "...", "center_id": "...", "tool": "get_slots" | "book",
+     "body": {...}, "at": 12.5}
+
+("at" : secondes depuis le début de la conversation, facultatif). --record
+écrit les conversations générées dans ce format.
+
+Rapport : débit, latences p50 / p95 / p99 par outil, taux d'erreur et issues
+des conversations.
+
+Usage : python load_generator.py [--conversations N] [--total M] [--speed x] [--url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from french_dates import DAY_NAMES, MONTH_NAMES, MONTH_NUMBERS
+from slot_index import PARIS_TZ
+from standin_servers import percentile
+
+# Temps de réflexion médians avant chaque appel (secondes, loi log-normale)
+THINK_TIMES = {
+    "specific_day": 6.0,   # L'agent annonce les créneaux, le client propose un autre jour
+    "period": 4.0,         # "Plutôt le matin ou l'après-midi ?"
+    "book": 40.0           # Nom, téléphone, email, véhicule, immatriculation
+}
+THINK_SIGMA = 0.5
+
+DAY_EXPRESSIONS = ("demain", "après-demain", "lundi suivant") + tuple(
+    f"{name}{suffix}" for name in DAY_NAMES[:6] for suffix in ("", " prochain")
+)
+PERIODS = ("matin", "après-midi")
+
+TIME_PATTERN = re.compile(r"\b(\d{2}):(\d{2})\b")
+DATE_PATTERN = re.compile(r"\b(\d{1,2}) (" + "|".join(MONTH_NUMBERS) + r")\b")
+
+PLANNING_UNAVAILABLE_PREFIX = "Je n'arrive pas à consulter le planning"
+
+
+# --- Conversations -------------------------------------------------------------
+
+class ToolCall:
+    """Appel d'outil à rejouer (corps fixe) ; book sans slot_id = heure annoncée"""
+
+    __slots__ = ("tool", "step", "body", "at")
+
+    def __init__(self, tool: str, step: str, body: Dict[str, Any], at: Optional[float] = None):
+        self.tool = tool
+        self.step = step
+        self.body = body
+        self.at = at
+
+
+def _step_of(tool: str, body: Dict[str, Any]) -> str:
+    """Étiquette du rapport : get_slots, get_slots:specific_day, get_slots:period, book"""
+    if tool != "get_slots":
+        return tool
+    if body.get("specific_day"):
+        return "get_slots:period" if body.get("period") else "get_slots:specific_day"
+    return "get_slots"
+
+
+def _client_info(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "first_name": rng.choice(("Jean", "Marie", "Luc", "Sophie", "Karim", "Léa")),
+        "last_name": f"Client{index}",
+        "phone": f"06{index:08d}"[-10:],
+        "email": f"client{index}@example.com",
+        "vehicle_brand": rng.choice(("Renault", "Peugeot", "Citroën", "Toyota")),
+        "vehicle_model": rng.choice(("Clio", "208", "C3", "Yaris")),
+        "license_plate": f"AB-{index % 1000:03d}-CD",
+        "vehicle_type": "voiture_particuliere"
+    }
+
+
+def _day_expression(rng: random.Random, today: date) -> str:
+    """Expression du client : nom de jour, relatif, ou date ("11 août")"""
+    if rng.random() < 0.2:
+        day = today + timedelta(days=rng.randint(2, 14))
+        return f"{day.day} {MONTH_NAMES[day.month]}"
+    return rng.choice(DAY_EXPRESSIONS)
+
+
+def scripted_conversation(rng: random.Random, index: int, centers: int, today: date, book: bool) -> Tuple[str, str, List[ToolCall]]:
+    """Conversation synthétique (identifiant, centre, appels) selon le script de l'agent"""
+    conversation_id = f"load-{index:06d}"
+    center_id = f"center-{rng.randrange(centers):03d}"
+    specific_day = _day_expression(rng, today)
+    calls = [
+        ToolCall("get_slots", "get_slots", {"conversation_id": conversation_id}),
+        ToolCall("get_slots", "get_slots:specific_day", {"conversation_id": conversation_id, "specific_day": specific_day}),
+        ToolCall("get_slots", "get_slots:period", {
+            "conversation_id": conversation_id,
+            "specific_day": specific_day,
+            "period": rng.choice(PERIODS)
+        })
+    ]
+    if book:
+        calls.append(ToolCall("book", "book", {
+            "conversation_id": conversation_id,
+            "client_info": _client_info(rng, index)
+        }))
+    return conversation_id, center_id, calls
+
+
+def load_replay(path: str) -> List[Tuple[str, str, List[ToolCall]]]:
+    """Conversations d'un fichier JSONL d'appels enregistrés (ordre du fichier conservé)"""
+    conversations: Dict[str, Tuple[str, List[ToolCall]]] = {}
+    with open(path, encoding="utf-8") as source:
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                tool = record["tool"]
+                body = record.get("body", {})
+                conversation_id = record.get("conversation_id") or body.get("conversation_id") or f"replay-{line_number}"
+                center_id = record["center_id"]
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_number} : appel d'outil invalide ({e})")
+            if tool not in ("get_slots", "book"):
+                raise ValueError(f"{path}:{line_number} : outil inconnu {tool}")
+            _, calls = conversations.setdefault(conversation_id, (center_id, []))
+            calls.append(ToolCall(tool, _step_of(tool, body), body, record.get("at")))
+    return [(conversation_id, center_id, calls) for conversation_id, (center_id, calls) in conversations.items()]
+
+
+def _announced_slot(response_text: str, center_id: str, today: date) -> Optional[str]:
+    """Identifiant (serveur de remplacement) de la première heure annoncée, None si aucune"""
+    from standin_servers import standin_slot_id
+
+    date_match = DATE_PATTERN.search(response_text)
+    time_match = TIME_PATTERN.search(response_text)
+    if not date_match or not time_match:
+        return None
+    day_number, month = int(date_match.group(1)), MONTH_NUMBERS[date_match.group(2)]
+    year = today.year + (1 if (month, day_number) < (today.month, today.day) else 0)
+    minutes = int(time_match.group(1)) * 60 + int(time_match.group(2))
+    return standin_slot_id(center_id, date(year, month, day_number), minutes)
+
+
+# --- Exécution -----------------------------------------------------------------
+
+class LoadReport:
+    """Latences, erreurs et issues collectées pendant l'essai"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.outcomes: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, step: str, elapsed: float, error: Optional[str]) -> None:
+        self.latencies[step].append(elapsed)
+        if error:
+            self.errors[step][error] += 1
+
+    def print(self, conversations: int) -> None:
+        duration = (self.finished or time.perf_counter()) - self.started
+        calls = sum(len(samples) for samples in self.latencies.values())
+        errors = sum(sum(counter.values()) for counter in self.errors.values())
+        print(f"\n📊 {conversations} conversations en {duration:.1f} s, {calls} appels d'outils "
+              f"({calls / duration:.1f} appels/s, {self.outcomes['booked'] / duration * 60:.1f} réservations/min), "
+              f"jusqu'à {self.max_in_flight} appels simultanés")
+        print(f"{'outil':<24} {'appels':>7} {'erreurs':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for step in ("get_slots", "get_slots:specific_day", "get_slots:period", "book"):
+            samples = sorted(self.latencies.get(step, []))
+            if not samples:
+                continue
+            failed = sum(self.errors[step].values())
+            print(f"{step:<24} {len(samples):>7} {failed / len(samples):>8.1%} "
+                  f"{percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f} "
+                  f"{percentile(samples, 99):>9.1f} {samples[-1]:>9.1f}")
+        print(f"Taux d'erreur global : {errors / calls:.2%}" if calls else "Aucun appel")
+        for step, counter in self.errors.items():
+            for error, count in counter.most_common():
+                print(f"   {step} : {error} × {count}")
+        print("Issues : " + ", ".join(f"{outcome} {count}" for outcome, count in self.outcomes.most_common()))
+
+
+def _think_time(rng: random.Random, step: str, speed: float) -> float:
+    median = THINK_TIMES.get(step.split(":")[-1], 0.0)
+    return median * math.exp(rng.gauss(0.0, THINK_SIGMA)) / speed if median else 0.0
+
+
+async def run_conversation(
+    client: httpx.AsyncClient,
+    conversation: Tuple[str, str, List[ToolCall]],
+    report: LoadReport,
+    rng: random.Random,
+    speed: float,
+    today: date,
+    recorder: Optional[Any]
+) -> None:
+    conversation_id, center_id, calls = conversation
+    started = time.perf_counter()
+    previous_at = 0.0
+    last_text = ""
+    for position, call in enumerate(calls):
+        # Attente avant l'appel : horodatage enregistré, sinon temps de réflexion simulé
+        if call.at is not None:
+            delay = max(0.0, call.at - previous_at) / speed
+            previous_at = call.at
+        else:
+            delay = _think_time(rng, call.step, speed) if position else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+        body = call.body
+        if call.tool == "book" and "slot_id" not in body:
+            slot_id = _announced_slot(last_text, center_id, today)
+            if slot_id is None:
+                report.outcomes["no_slot_offered"] += 1
+                return
+            body = {**body, "slot_id": slot_id}
+        if recorder is not None:
+            recorder.write(json.dumps({
+                "conversation_id": conversation_id,
+                "center_id": center_id,
+                "tool": call.tool,
+                "body": body,
+                "at": round((time.perf_counter() - started) * speed, 3)  # Temps de conversation réel
+            }, ensure_ascii=False) + "\n")
+
+        error = None
+        result: Dict[str, Any] = {}
+        report.in_flight += 1
+        report.max_in_flight = max(report.max_in_flight, report.in_flight)
+        t0 = time.perf_counter()
+        try:
+            response = await client.post(f"/webhook/elevenlabs/{center_id}/{call.tool}", json=body)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            else:
+                result = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            error = type(e).__name__
+        finally:
+            report.in_flight -= 1
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        # Réponses de repli : l'appel a abouti mais le service est dégradé
+        text = result.get("response") or result.get("message") or ""
+        if error is None and (text.startswith(PLANNING_UNAVAILABLE_PREFIX) or result.get("booking_failed")):
+            error = "indisponible"
+        report.record(call.step, elapsed, error)
+        if error:
+            report.outcomes["error"] += 1
+            return
+        last_text = text
+        if call.tool == "book":
+            report.outcomes["slot_taken" if result.get("slot_taken") else "booked"] += 1
+            return
+    report.outcomes["completed_without_booking"] += 1
+
+
+async def run(arguments: argparse.Namespace) -> int:
+    rng = random.Random(arguments.seed)
+    today = datetime.now(PARIS_TZ).date()
+
+    if arguments.replay:
+        conversations = load_replay(arguments.replay)
+        if arguments.total:
+            conversations = conversations[:arguments.total]
+    else:
+        total = arguments.total or arguments.conversations
+        conversations = [
+            scripted_conversation(rng, index, arguments.centers, today, not arguments.no_book)
+            for index in range(total)
+        ]
+
+    if arguments.url:
+        limits = httpx.Limits(max_connections=arguments.conversations, max_keepalive_connections=arguments.conversations)
+        client = httpx.AsyncClient(base_url=arguments.url.rstrip("/"), limits=limits, timeout=arguments.timeout)
+        target = arguments.url
+    else:
+        # Backend dans le processus, Simplauto simulé, base de réservations temporaire
+        os.environ.setdefault("BOOKING_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="load-"), "bookings.db"))
+        os.environ.setdefault("SIMPLAUTO_BOOKING_PATH", "/private-api/bookings/")  # Route du Simplauto simulé
+        from backend_api import app
+        from simplauto_client import simplauto
+        from standin_servers import StandinSettings, create_standin_app
+
+        standin = create_standin_app(StandinSettings(
+            "STANDIN_SIMPLAUTO",
+            latency=arguments.upstream_latency,
+            error_rate=arguments.upstream_error_rate
+        ))
+        await simplauto.reconfigure(base_url="http://simplauto", transport=httpx.ASGITransport(app=standin))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://webhook", timeout=arguments.timeout)
+        target = f"backend dans le processus, Simplauto simulé ({arguments.upstream_latency})"
+
+    print(f"🚦 {len(conversations)} conversations, {arguments.conversations} simultanées, "
+          f"temps de réflexion ÷{arguments.speed:g} → {target}")
+
+    report = LoadReport()
+    queue: asyncio.Queue = asyncio.Queue()
+    for conversation in conversations:
+        queue.put_nowait(conversation)
+    recorder = open(arguments.record, "w", encoding="utf-8") if arguments.record else None
+
+    async def caller(seed: int) -> None:
+        caller_rng = random.Random(seed)
+        # Arrivées étalées sur --ramp secondes plutôt qu'un pic au démarrage
+        await asyncio.sleep(caller_rng.uniform(0, arguments.ramp))
+        while not queue.empty():
+            conversation = queue.get_nowait()
+            await run_conversation(client, conversation, report, caller_rng, arguments.speed, today, recorder)
+
+    try:
+        await asyncio.gather(*(caller(arguments.seed + i) for i in range(arguments.conversations)))
+    finally:
+        report.finished = time.perf_counter()
+        await client.aclose()
+        if recorder is not None:
+            recorder.close()
+        if not arguments.url:
+            await simplauto.close()
+
+    report.print(len(conversations))
+    calls = sum(len(samples) for samples in report.latencies.values())
+    errors = sum(sum(counter.values()) for counter in report.errors.values())
+    return 1 if calls and errors / calls > arguments.max_error_rate else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Conversations ElevenLabs simultanées contre les webhooks")
+    parser.add_argument("--conversations", type=int, default=50, help="conversations simultanées")
+    parser.add_argument("--total", type=int, default=0, help="conversations au total (défaut : --conversations)")
+    parser.add_argument("--centers", type=int, default=20, help="centres distincts (conversations synthétiques)")
+    parser.add_argument("--speed", type=float, default=1.0, help="accélération des temps de réflexion (10 = dix fois plus courts)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="étalement des premiers appels (secondes)")
+    parser.add_argument("--url", help="backend à tester (défaut : dans le processus)")
+    parser.add_argument("--replay", help="fichier JSONL d'appels d'outils à rejouer")
+    parser.add_argument("--record", help="enregistre les appels envoyés (JSONL rejouable)")
+    parser.add_argument("--no-book", action="store_true", help="conversations sans réservation")
+    parser.add_argument("--upstream-latency", default="lognormal:40:0.6", help="latence Simplauto simulée (dans le processus)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="taux d'erreur Simplauto simulé (dans le processus)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="délai maximal d'un appel (secondes)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="taux d'erreur au-delà duquel le code de sortie vaut 1")
+    parser.add_argument("--seed", type=int, default=7)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
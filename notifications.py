@@ -0,0 +1,293 @@
+"""
+Envoi asynchrone des notifications de réservation (SMS, email, centre)
+
+Le webhook /book ne fait qu'ajouter les notifications à l'outbox SQLite, dans
+la transaction de la réservation (voir booking_store.py) : il répond sans
+attendre les fournisseurs. Un pool de workers asyncio réclame ensuite les
+notifications dues par lots, les regroupe par canal (un envoi groupé par
+fournisseur) et les retente avec un délai exponentiel (avec gigue) jusqu'à
+NOTIFY_MAX_ATTEMPTS tentatives.
+
+Canaux configurables par variable d'environnement (vide = canal désactivé) :
+- NOTIFY_SMS_SINK, NOTIFY_EMAIL_SINK, NOTIFY_CENTER_SINK
+- "file:chemin.jsonl" : une ligne JSON par notification (essais locaux)
+- "http(s)://..." : POST JSON {"channel", "notifications": [...]} par lot
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from booking_store import BookingRepository, booking_store
+
+SMS = "sms"
+EMAIL = "email"
+CENTER = "center"
+CHANNELS = (SMS, EMAIL, CENTER)
+
+
+# --- Canaux d'envoi ------------------------------------------------------------
+
+class NotificationSink:
+    """Fournisseur d'un canal, appelé avec un lot de notifications"""
+
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Envoie un lot
+
+        Returns:
+            pour chaque notification, None si envoyée, sinon le message d'erreur
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class FileSink(NotificationSink):
+    """Ajoute les notifications à un fichier JSONL (remplace un fournisseur en local)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> List[Optional[str]]:
+        lines = "".join(json.dumps(notification, ensure_ascii=False) + "\n" for notification in notifications)
+
+        def append() -> None:
+            with open(self.path, "a", encoding="utf-8") as output:
+                output.write(lines)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, append)
+        except OSError as e:
+            return [str(e)] * len(notifications)
+        return [None] * len(notifications)
+
+
+class HttpSink(NotificationSink):
+    """POST du lot à une passerelle HTTP (fournisseur SMS / email, webhook du centre)"""
+
+    def __init__(self, url: str, channel: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.channel = channel
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=float(os.getenv("NOTIFY_HTTP_TIMEOUT", "5"))
+        )
+
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> List[Optional[str]]:
+        try:
+            response = await self._client.post(self.url, json={"channel": self.channel, "notifications": notifications})
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            return [f"{type(e).__name__}: {e}"] * len(notifications)
+        return [None] * len(notifications)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_sink(spec: str, channel: str) -> Optional[NotificationSink]:
+    """Canal décrit par "file:chemin" ou une URL http(s) ; None si vide"""
+    if not spec:
+        return None
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec, channel)
+    raise ValueError(f"Canal de notification inconnu pour {channel}: {spec}")
+
+
+def sinks_from_env() -> Dict[str, NotificationSink]:
+    sinks = {}
+    for channel in CHANNELS:
+        sink = create_sink(os.getenv(f"NOTIFY_{channel.upper()}_SINK", ""), channel)
+        if sink is not None:
+            sinks[channel] = sink
+    return sinks
+
+
+# --- Contenu -------------------------------------------------------------------
+
+def booking_notifications(
+    center_id: str,
+    slot_id: str,
+    client_info: Dict[str, Any],
+    formatted_date: str,
+    channels: Optional[List[str]] = None
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Notifications (canal, contenu) d'une réservation confirmée, limitées aux canaux actifs"""
+    channels = CHANNELS if channels is None else channels
+    client_name = f"{client_info['first_name']} {client_info['last_name']}"
+    notifications = []
+    if SMS in channels:
+        notifications.append((SMS, {
+            "to": client_info["phone"],
+            "text": f"Votre contrôle technique est confirmé pour {formatted_date}. Pensez à apporter votre carte grise."
+        }))
+    if EMAIL in channels and client_info.get("email"):
+        notifications.append((EMAIL, {
+            "to": client_info["email"],
+            "subject": "Confirmation de votre rendez-vous de contrôle technique",
+            "text": (
+                f"Bonjour {client_name},\n\n"
+                f"Votre rendez-vous est confirmé pour {formatted_date}.\n"
+                f"Véhicule : {client_info['vehicle_brand']} {client_info['vehicle_model']} "
+                f"({client_info['license_plate']})\n\n"
+                "Pensez à apporter votre carte grise le jour du rendez-vous."
+            )
+        }))
+    if CENTER in channels:
+        notifications.append((CENTER, {
+            "center_id": center_id,
+            "slot_id": slot_id,
+            "date": formatted_date,
+            "client": client_info
+        }))
+    return notifications
+
+
+# --- Workers -------------------------------------------------------------------
+
+class NotificationDispatcher:
+    """Pool de workers qui vident l'outbox des notifications"""
+
+    def __init__(
+        self,
+        store: BookingRepository,
+        sinks: Optional[Dict[str, NotificationSink]] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.store = store
+        self.sinks = sinks if sinks is not None else sinks_from_env()
+        self.workers = workers if workers is not None else int(os.getenv("NOTIFY_WORKERS", "2"))
+        self.batch_size = batch_size if batch_size is not None else int(os.getenv("NOTIFY_BATCH_SIZE", "50"))
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("NOTIFY_POLL_INTERVAL", "2"))
+        self.max_attempts = max_attempts if max_attempts is not None else int(os.getenv("NOTIFY_MAX_ATTEMPTS", "8"))
+        self.backoff = backoff if backoff is not None else float(os.getenv("NOTIFY_BACKOFF", "2"))
+        self.max_backoff = max_backoff if max_backoff is not None else float(os.getenv("NOTIFY_MAX_BACKOFF", "600"))
+        self.lease_seconds = lease_seconds if lease_seconds is not None else float(os.getenv("NOTIFY_LEASE_SECONDS", "60"))
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Compteurs
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def channels(self) -> List[str]:
+        """Canaux actifs (seuls ceux-ci reçoivent des notifications)"""
+        return list(self.sinks)
+
+    def wake(self) -> None:
+        """Réveille les workers (nouvelles notifications validées)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._tasks or not self.sinks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        for sink in self.sinks.values():
+            await sink.close()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                print(f"Erreur envoi notifications: {e}")
+                processed = 0
+            if processed:
+                continue
+            # Outbox vide : attendre un réveil ou le prochain passage (retentatives)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Réclame et envoie un lot ; retourne le nombre de notifications traitées"""
+        batch = await self.store.claim_notifications(self.batch_size, self.lease_seconds)
+        if not batch:
+            return 0
+        self.batches += 1
+
+        by_channel: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for notification in batch:
+            by_channel[notification["channel"]].append(notification)
+        channels = list(by_channel)
+        results = await asyncio.gather(*(self._send(channel, by_channel[channel]) for channel in channels))
+
+        sent, retries, failures = [], [], []
+        for channel, errors in zip(channels, results):
+            for notification, error in zip(by_channel[channel], errors):
+                if error is None:
+                    sent.append(notification["id"])
+                elif notification["attempts"] >= self.max_attempts:
+                    failures.append((notification["id"], error))
+                    print(f"Notification {channel} abandonnée ({notification['booking_id']}): {error}")
+                else:
+                    retries.append((notification["id"], self._next_attempt_at(notification["attempts"]), error))
+        await self.store.complete_notifications(sent, retries, failures)
+
+        self.sent += len(sent)
+        self.retried += len(retries)
+        self.failed += len(failures)
+        return len(batch)
+
+    async def _send(self, channel: str, notifications: List[Dict[str, Any]]) -> List[Optional[str]]:
+        sink = self.sinks.get(channel)
+        if sink is None:
+            return [f"Canal {channel} non configuré"] * len(notifications)
+        items = [
+            {"id": notification["id"], "booking_id": notification["booking_id"], **notification["payload"]}
+            for notification in notifications
+        ]
+        try:
+            return await sink.send_batch(items)
+        except Exception as e:
+            return [f"{type(e).__name__}: {e}"] * len(notifications)
+
+    def _next_attempt_at(self, attempts: int) -> float:
+        """Délai exponentiel plafonné, avec gigue (50 à 100 % du délai)"""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+        return time.time() + delay * random.uniform(0.5, 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channels": self.channels,
+            "workers": len(self._tasks),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+
+# Instance partagée par l'application
+notification_dispatcher = NotificationDispatcher(booking_store)
@@ -1,4 +1,5 @@
 from datetime_utils import format_current_context
+from french_dates import DAY_NAMES
 from typing import Dict, Any
 import json
 
@@ -210,7 +211,7 @@ Si client mentionne un tarif moins cher en ligne, SCRIPT EXACT :
             return "Horaires à confirmer au 01 XX XX XX XX"
         
         days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        day_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+        day_names = [name.capitalize() for name in DAY_NAMES]  # Tables partagées (french_dates.py)
         
         formatted_hours = []
         for i, day in enumerate(days):
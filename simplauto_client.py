@@ -0,0 +1,239 @@
+"""
+Client HTTP partagé pour l'API Simplauto
+
+Un seul pool de connexions pour toute la durée de vie de l'application :
+les appels webhook réutilisent les connexions ouvertes (pas de DNS + TCP + TLS
+à chaque tour de parole).
+
+La cible est injectable (base_url, transport httpx) pour les benchmarks et
+les essais hors ligne, voir reconfigure() et standin_servers.py.
+
+Les appels passent par un disjoncteur (voir circuit_breaker.py) : budget de
+latence court et échec immédiat quand Simplauto est lent ou en erreur.
+En option, les lectures lentes sont doublées (voir hedging.py).
+
+Les réservations (écritures) ne sont ni doublées ni coupées par le budget de
+latence : une écriture interrompue pourrait avoir abouti côté Simplauto. Elles
+partent sur le même pool, avec la clé d'idempotence du webhook /book en
+en-tête Idempotency-Key : une réservation renvoyée après une transmission
+interrompue ne crée pas de doublon. Elles comptent dans la fenêtre du
+disjoncteur, qui les refuse sans appel réseau quand il est ouvert.
+
+Contrat de réservation supposé (non vérifié auprès de Simplauto, seul
+standin_servers.py l'implémente) ; le chemin n'a donc pas de valeur par
+défaut : SIMPLAUTO_BOOKING_PATH est obligatoire si SIMPLAUTO_SUBMIT_BOOKINGS
+est actif (erreur au démarrage de backend_api sinon).
+
+    POST {SIMPLAUTO_BOOKING_PATH}
+    Idempotency-Key: <clé du webhook /book>
+    {"slot": <id du créneau>, "reference": <id de la réservation locale>,
+     "customer": {"first_name", "last_name", "phone", "email"},
+     "vehicle": {"brand", "model", "license_plate", "vehicle_type", "vehicle_engine"}}
+
+    2xx : {"id": <id Simplauto>, "starts_at": <ISO 8601>, ...} (corps facultatif)
+    409 / 410 : créneau déjà pris ; même clé rejouée : réponse d'origine
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from circuit_breaker import CircuitBreaker
+from hedging import Hedger
+from timing import span
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Lit un booléen depuis les variables d'environnement"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name: str, default: float) -> float:
+    """Lit un nombre décimal depuis les variables d'environnement"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Lit un entier depuis les variables d'environnement"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _slot_taken(error: Exception) -> bool:
+    """Refus de réservation de Simplauto : créneau déjà pris (409 / 410)"""
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in (409, 410)
+
+
+class SimplautoClient:
+    """Pool de connexions partagé vers l'API Simplauto"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_token: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = (base_url or os.getenv("SIMPLAUTO_BASE_URL", "https://www.simplauto.com")).rstrip("/")
+        self.api_token = api_token or os.getenv("SIMPLAUTO_API_TOKEN", "940c066c0c2d6e1f0d302a5b44f77f8af7b236b8")
+        # Transport httpx de remplacement (httpx.ASGITransport, MockTransport) : sans réseau
+        self.transport = transport
+
+        # Configuration du pool (surchargeable par variables d'environnement)
+        self.http2 = _env_bool("SIMPLAUTO_HTTP2", False)
+        self.max_connections = _env_int("SIMPLAUTO_MAX_CONNECTIONS", 20)
+        self.max_keepalive_connections = _env_int("SIMPLAUTO_MAX_KEEPALIVE", 10)
+        self.keepalive_expiry = _env_float("SIMPLAUTO_KEEPALIVE_EXPIRY", 30.0)
+
+        # Timeouts par phase (secondes)
+        self.timeout = httpx.Timeout(
+            connect=_env_float("SIMPLAUTO_CONNECT_TIMEOUT", 3.0),
+            read=_env_float("SIMPLAUTO_READ_TIMEOUT", 10.0),
+            write=_env_float("SIMPLAUTO_WRITE_TIMEOUT", 5.0),
+            pool=_env_float("SIMPLAUTO_POOL_TIMEOUT", 2.0)
+        )
+
+        # Disjoncteur : budget de latence d'un tour de parole, seuils d'erreur et de lenteur
+        self.breaker = CircuitBreaker(
+            "simplauto",
+            latency_budget=_env_float("SIMPLAUTO_LATENCY_BUDGET", 2.5),
+            slow_call_threshold=_env_float("SIMPLAUTO_BREAKER_SLOW_CALL", 1.5),
+            failure_rate_threshold=_env_float("SIMPLAUTO_BREAKER_FAILURE_RATE", 0.5),
+            window_size=_env_int("SIMPLAUTO_BREAKER_WINDOW", 20),
+            min_calls=_env_int("SIMPLAUTO_BREAKER_MIN_CALLS", 5),
+            open_seconds=_env_float("SIMPLAUTO_BREAKER_OPEN_SECONDS", 15.0)
+        )
+
+        # Doublage des lectures lentes (désactivé par défaut)
+        self.hedger = Hedger(
+            enabled=_env_bool("SIMPLAUTO_HEDGE", False),
+            percentile=_env_float("SIMPLAUTO_HEDGE_PERCENTILE", 95.0),
+            initial_delay=_env_float("SIMPLAUTO_HEDGE_DELAY", 0.3),
+            max_rate=_env_float("SIMPLAUTO_HEDGE_MAX_RATE", 0.1)
+        )
+
+        self.submit_bookings = _env_bool("SIMPLAUTO_SUBMIT_BOOKINGS", True)
+        self.booking_path = os.getenv("SIMPLAUTO_BOOKING_PATH", "")  # Obligatoire si submit_bookings
+
+        self.headers = {
+            "accept": "application/json",
+            "Authorization": f"Bearer {self.api_token}"
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Construit le client httpx avec les limites du pool"""
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=limits,
+            http2=self.http2,
+            transport=self.transport
+        )
+
+    def check_booking_config(self) -> None:
+        """
+        Raises:
+            RuntimeError: transmission des réservations active sans SIMPLAUTO_BOOKING_PATH
+        """
+        if self.submit_bookings and not self.booking_path:
+            raise RuntimeError(
+                "SIMPLAUTO_BOOKING_PATH est obligatoire quand SIMPLAUTO_SUBMIT_BOOKINGS est actif "
+                "(ou SIMPLAUTO_SUBMIT_BOOKINGS=false pour des réservations locales)"
+            )
+
+    async def start(self) -> None:
+        """Ouvre le pool de connexions (appelé au démarrage de l'application)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions (appelé à l'arrêt de l'application)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def reconfigure(
+        self,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        """
+        Change la cible des appels (benchmarks, essais hors ligne)
+
+        Le pool en cours est fermé ; le suivant est ouvert sur base_url, via
+        `transport` s'il est donné (sinon le réseau).
+        """
+        await self.close()
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        self.transport = transport
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client partagé, créé à la demande si le lifespan n'a pas été exécuté"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def fetch_slots(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Récupère la liste brute des créneaux Simplauto
+
+        Raises:
+            CircuitOpenError: disjoncteur ouvert (aucun appel réseau)
+            asyncio.TimeoutError: budget de latence dépassé
+        """
+        return await self.breaker.call(lambda: self._get_slots(params))
+
+    async def _get_slots(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Le doublage éventuel reste un seul appel pour le disjoncteur
+        return await self.hedger.run(lambda: self._request_slots(params))
+
+    async def _request_slots(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        response = await self.client.get("/private-api/slots/", params=params)
+        response.raise_for_status()
+        with span("json"):
+            return response.json()
+
+    async def submit_booking(self, payload: Dict[str, Any], idempotency_key: str) -> Dict[str, Any]:
+        """
+        Transmet une réservation à Simplauto
+
+        Passe par le disjoncteur sans budget de latence ; un refus 409 / 410
+        (créneau déjà pris) est une réponse de Simplauto, pas un échec.
+
+        Raises:
+            CircuitOpenError: disjoncteur ouvert (aucun appel réseau)
+            httpx.HTTPStatusError: refus de Simplauto (409 / 410 : créneau déjà pris)
+            RuntimeError: SIMPLAUTO_BOOKING_PATH absent
+        """
+        self.check_booking_config()
+        return await self.breaker.call(
+            lambda: self._post_booking(payload, idempotency_key),
+            bounded=False,
+            is_failure=lambda e: not _slot_taken(e)
+        )
+
+    async def _post_booking(self, payload: Dict[str, Any], idempotency_key: str) -> Dict[str, Any]:
+        response = await self.client.post(
+            self.booking_path,
+            json=payload,
+            headers={"Idempotency-Key": idempotency_key}
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+
+# Instance partagée par toute l'application
+simplauto = SimplautoClient()
@@ -0,0 +1,292 @@
+"""
+Cache des créneaux Simplauto
+
+Clé : (center_id, vehicle_type Simplauto, vehicle_engine Simplauto, fenêtre de dates).
+Stockage dans le processus, en mémoire partagée entre workers ou dans un
+serveur Redis (voir slot_cache_backends.py).
+TTL court, taille bornée (LRU) et stale-while-revalidate : une entrée
+expirée depuis peu est servie immédiatement pendant qu'une tâche de fond
+la rafraîchit. Si l'amont est indisponible, fallback() rend la dernière
+valeur connue quel que soit son âge.
+
+Invalidation à l'écriture : un index slot_id → clés permet de retirer en O(1)
+un créneau réservé de toutes les entrées qui le contiennent (valeurs
+SlotColumns : slot_ids + mark_unavailable). Le créneau reste marqué réservé
+pendant booked_ttl, le temps que Simplauto le retire de ses réponses.
+
+SingleFlight regroupe les appels amont identiques simultanés : un seul
+appel réel, partagé par tous les appelants concurrents.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from slot_cache_backends import CacheBackend, CacheEntry, Codec, create_backend
+from slot_store import SlotColumns
+from timing import current_timer
+
+# Format des valeurs pour les backends partagés (mémoire partagée, Redis)
+SLOT_COLUMNS_CODEC = Codec(encode=lambda columns: columns.to_bytes(), decode=SlotColumns.from_buffer)
+
+
+class SlotCache:
+    """Cache TTL + LRU avec rafraîchissement en arrière-plan"""
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        backend: Optional[CacheBackend] = None
+    ):
+        self.ttl = ttl if ttl is not None else float(os.getenv("SLOT_CACHE_TTL", "30"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("SLOT_CACHE_STALE_TTL", "120"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SLOT_CACHE_MAX_ENTRIES", "256"))
+        self.booked_ttl = float(os.getenv("SLOT_CACHE_BOOKED_TTL", "600"))
+
+        # Stockage des entrées (voir slot_cache_backends.py)
+        self.backend = backend if backend is not None else create_backend(None, self.max_entries, SLOT_COLUMNS_CODEC)
+        self.backend.on_evict = self._forget
+
+        self._indexed: Dict[Hashable, Any] = {}  # clé → valeur présente dans l'index slot_id
+        self._keys_by_slot: Dict[str, Set[Hashable]] = {}
+        self._booked: Dict[str, float] = {}  # slot_id → fin de marquage (time.time)
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Compteurs
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.fallbacks = 0
+        self.booked_invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Retourne l'entrée brute (même expirée) sans la rafraîchir"""
+        entry = self.backend.load(key)
+        self._track(key, entry)
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Retourne l'entrée brute sans modifier l'ordre LRU (statut, supervision)"""
+        entry = self.backend.load(key, touch=False)
+        self._track(key, entry)
+        return entry
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Enregistre une valeur et évince les entrées les plus anciennes"""
+        self._forget(key)
+        self._apply_booked(value)
+        entry = CacheEntry(value, time.time())
+        self.backend.store(key, entry)
+        self._track(key, entry)
+
+    # --- Index slot_id → clés ----------------------------------------------
+
+    def _track(self, key: Hashable, entry: Optional[CacheEntry]) -> None:
+        """Indexe une valeur nouvelle pour ce processus (écrite ici ou par un autre worker)"""
+        if entry is None or self._indexed.get(key) is entry.value:
+            return
+        self._forget(key)
+        if self._apply_booked(entry.value):
+            self.backend.persist(key, entry)
+        self._indexed[key] = entry.value
+        for slot_id in getattr(entry.value, "slot_ids", ()):
+            keys = self._keys_by_slot.get(slot_id)
+            if keys is None:
+                self._keys_by_slot[slot_id] = keys = set()
+            keys.add(key)
+
+    def _forget(self, key: Hashable) -> None:
+        """Retire une clé de l'index slot_id (éviction, remplacement, invalidation)"""
+        value = self._indexed.pop(key, None)
+        for slot_id in getattr(value, "slot_ids", ()):
+            keys = self._keys_by_slot.get(slot_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_slot[slot_id]
+
+    def _apply_booked(self, value: Any) -> int:
+        """Retire d'une valeur les créneaux réservés que Simplauto renvoie encore"""
+        if not self._booked or not hasattr(value, "mark_unavailable"):
+            return 0
+        now = time.time()
+        changed = 0
+        for slot_id, expires_at in list(self._booked.items()):
+            if expires_at <= now:
+                del self._booked[slot_id]
+            elif value.mark_unavailable(slot_id):
+                changed += 1
+        return changed
+
+    def mark_booked(self, slot_id: str) -> int:
+        """
+        Retire un créneau réservé de toutes les entrées du cache
+
+        Returns:
+            Nombre d'entrées modifiées
+        """
+        self._booked[slot_id] = time.time() + self.booked_ttl
+        updated = 0
+        for key in list(self._keys_by_slot.get(slot_id, ())):
+            entry = self.peek(key)
+            if entry is not None and entry.value.mark_unavailable(slot_id):
+                self.backend.persist(key, entry)
+                updated += 1
+        self.booked_invalidations += updated
+        return updated
+
+    def find_slot(self, slot_id: str, match: Optional[Callable[[Hashable], bool]] = None) -> Optional[Any]:
+        """
+        Créneau en cache par identifiant, en O(1) via l'index slot_id → clés
+
+        Args:
+            match: filtre sur les clés (par exemple le centre)
+
+        Returns:
+            SlotRecord du créneau (réservé ou non), None s'il n'est dans aucune entrée indexée
+        """
+        for key in list(self._keys_by_slot.get(slot_id, ())):
+            if match is not None and not match(key):
+                continue
+            entry = self.peek(key)
+            row = entry.value.row_of(slot_id) if entry is not None else None
+            if row is not None:
+                return entry.value.record(row)
+        return None
+
+    def fallback(self, key: Hashable) -> Optional[CacheEntry]:
+        """Dernière valeur connue, même au-delà de stale_ttl (amont indisponible)"""
+        entry = self.get(key)
+        if entry is not None:
+            self.fallbacks += 1
+        return entry
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Supprime une entrée, ou tout le cache si aucune clé n'est donnée"""
+        if key is None:
+            self.backend.clear()
+            self._indexed.clear()
+            self._keys_by_slot.clear()
+            self._booked.clear()
+        else:
+            self.backend.delete(key)
+            self._forget(key)
+
+    async def get_or_fetch(self, key: Hashable, fetcher: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retourne la valeur en cache ou la récupère via fetcher
+
+        - entrée fraîche (âge < ttl) : retournée directement
+        - entrée périmée (âge < ttl + stale_ttl) : retournée directement,
+          rafraîchissement lancé en arrière-plan
+        - sinon : fetcher est attendu et le résultat mis en cache
+        """
+        # Lecture asynchrone : un backend réseau ne bloque pas la boucle
+        entry = await self.backend.aload(key)
+        self._track(key, entry)
+        if entry is not None:
+            age = entry.age()
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._schedule_refresh(key, fetcher)
+                return entry.value
+
+        self.misses += 1
+        value = await fetcher()
+        self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: Hashable, fetcher: Callable[[], Awaitable[Any]]) -> None:
+        """Lance un rafraîchissement de fond (un seul à la fois par clé)"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, fetcher))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: Hashable, fetcher: Callable[[], Awaitable[Any]]) -> None:
+        # La tâche hérite du contexte de l'appel qui l'a lancée : ses étapes
+        # (upstream, parse) ne doivent pas s'ajouter au StageTimer de cet appel
+        current_timer.set(None)
+        try:
+            value = await fetcher()
+            self.set(key, value)
+            self.refreshes += 1
+        except Exception as e:
+            # L'entrée périmée reste servie jusqu'à stale_ttl
+            self.refresh_errors += 1
+            print(f"Erreur rafraîchissement cache créneaux {key}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du cache"""
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "fallbacks": self.fallbacks,
+            "booked_invalidations": self.booked_invalidations,
+            "booked_slots": len(self._booked),
+            "backend": self.backend.stats()
+        }
+
+
+class SingleFlight:
+    """Déduplication des appels concurrents portant sur la même clé"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute fn, ou attend l'appel déjà en cours pour la même clé
+
+        Le résultat (ou l'exception) est transmis à tous les appelants.
+        L'annulation d'un appelant n'annule pas l'appel partagé.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._done(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Marquer l'exception comme lue même si tous les appelants ont été annulés
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs de déduplication"""
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+            "dedup_ratio": round(self.shared / self.calls, 4) if self.calls else 0.0
+        }
+
+
+# Instances partagées par l'application
+slot_cache = SlotCache()
+slot_flights = SingleFlight()
@@ -0,0 +1,710 @@
+"""
+Stockage des entrées du cache de créneaux
+
+SlotCache délègue le stockage de ses CacheEntry à un backend :
+
+- InProcessBackend : OrderedDict LRU dans le processus (comportement historique,
+  un cache par worker)
+- SharedMemoryBackend : segments multiprocessing.shared_memory partagés par
+  tous les workers de la machine ; les colonnes sont relues sans copie
+- RedisBackend : serveur parlant le protocole Redis (RESP), partagé entre
+  workers et machines
+
+Les backends partagés stockent la valeur sérialisée (codec) sous une
+génération : un petit pointeur (génération, horodatage) par clé, et un
+contenu par génération. Un worker qui a déjà décodé la génération courante
+la réutilise sans rien relire.
+
+Choix du backend : SLOT_CACHE_BACKEND = memory (défaut), shm ou redis.
+"""
+
+import asyncio
+import encodings.idna  # noqa: F401  (codec chargé ici : le premier connect du thread Redis échouerait sinon)
+import hashlib
+import os
+import socket
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class CacheEntry:
+    """Valeur en cache avec son horodatage (time.time, comparable entre processus)"""
+
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.stored_at
+
+
+class Codec:
+    """Sérialisation des valeurs pour les backends partagés"""
+
+    def __init__(self, encode: Callable[[Any], bytes], decode: Callable[..., Any]):
+        self.encode = encode
+        # decode(buffer, writable=..., owner=...)
+        self.decode = decode
+
+
+def _digest(key: Hashable) -> str:
+    """Nom stable d'une clé de cache (tuple de str/int/None) pour les stockages partagés"""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20]
+
+
+def _new_generation() -> int:
+    """Génération unique entre processus (horloge + pid)"""
+    return (time.time_ns() << 16 | os.getpid() & 0xFFFF) & 0x7FFFFFFFFFFFFFFF
+
+
+class CacheBackend:
+    """Interface des backends de stockage du cache de créneaux"""
+
+    name = "base"
+    shared = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # Appelé avec la clé quand une entrée sort du stockage local (éviction)
+        self.on_evict: Optional[Callable[[Hashable], None]] = None
+
+    def load(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        """Entrée de la clé (touch : la marquer comme récemment utilisée)"""
+        raise NotImplementedError
+
+    async def aload(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        """load depuis la boucle asyncio (les backends réseau n'y bloquent pas)"""
+        return self.load(key, touch)
+
+    def store(self, key: Hashable, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def persist(self, key: Hashable, entry: CacheEntry) -> None:
+        """Propage une modification en place de entry.value (créneau réservé)"""
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "shared": self.shared}
+
+    def _evicted(self, key: Hashable) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+
+class InProcessBackend(CacheBackend):
+    """LRU en mémoire du processus : valeurs gardées telles quelles"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        super().__init__(max_entries)
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def load(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and touch:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._evicted(evicted_key)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _SharedBackend(CacheBackend):
+    """
+    Base des backends partagés : pointeur (génération, horodatage) par clé et
+    mémoire locale des générations déjà décodées
+    """
+
+    shared = True
+
+    def __init__(self, max_entries: int, codec: Codec):
+        super().__init__(max_entries)
+        self.codec = codec
+        # clé → (génération, entrée décodée)
+        self._decoded: "OrderedDict[Hashable, Tuple[int, CacheEntry]]" = OrderedDict()
+        self.shared_hits = 0
+        self.decodes = 0
+        self.errors = 0
+
+    # À fournir par les sous-classes
+    def _read_pointer(self, name: str) -> Optional[Tuple[int, float]]:
+        raise NotImplementedError
+
+    def _read_payload(self, name: str, generation: int) -> Optional[Tuple[Any, bool, Any]]:
+        """(buffer, modifiable, propriétaire) du contenu d'une génération"""
+        raise NotImplementedError
+
+    def _write(self, name: str, generation: int, stored_at: float, payload: bytes) -> None:
+        raise NotImplementedError
+
+    def _remove(self, name: str) -> None:
+        raise NotImplementedError
+
+    def _remove_all(self) -> None:
+        raise NotImplementedError
+
+    def load(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        try:
+            found = self._fetch(_digest(key), self._known_generation(key))
+        except Exception as e:
+            self.errors += 1
+            print(f"Erreur lecture cache partagé ({self.name}): {e}")
+            return None
+        return self._resolve(key, found, touch)
+
+    def _known_generation(self, key: Hashable) -> Optional[int]:
+        known = self._decoded.get(key)
+        return known[0] if known is not None else None
+
+    def _fetch(self, name: str, known_generation: Optional[int]) -> Optional[Tuple[int, float, Any]]:
+        """
+        Lit la génération courante d'une clé dans le stockage partagé
+
+        Returns:
+            (génération, horodatage, (buffer, modifiable, propriétaire) ou None si
+            la génération est déjà décodée ici), None si la clé est absente
+        """
+        for _ in range(3):
+            pointer = self._read_pointer(name)
+            if pointer is None:
+                return None
+            generation, stored_at = pointer
+            if generation == known_generation:
+                return generation, stored_at, None
+            payload = self._read_payload(name, generation)
+            if payload is not None:
+                return generation, stored_at, payload
+            # Génération remplacée entre-temps : relire le pointeur
+        return None
+
+    def _resolve(self, key: Hashable, found: Optional[Tuple[int, float, Any]], touch: bool) -> Optional[CacheEntry]:
+        """Entrée correspondant au résultat de _fetch (décodée une fois par génération)"""
+        if found is None:
+            self._forget(key)
+            return None
+        generation, stored_at, payload = found
+        if payload is None:
+            known = self._decoded.get(key)
+            if known is None or known[0] != generation:
+                return None  # Génération locale évincée pendant la lecture
+            if touch:
+                self._decoded.move_to_end(key)
+            self.shared_hits += 1
+            return known[1]
+        buffer, writable, owner = payload
+        try:
+            entry = CacheEntry(self.codec.decode(buffer, writable=writable, owner=owner), stored_at)
+        except Exception as e:
+            self.errors += 1
+            print(f"Erreur lecture cache partagé ({self.name}): {e}")
+            return None
+        self.decodes += 1
+        self._remember(key, generation, entry)
+        return entry
+
+    def _background(self, fn: Callable[[], Any], action: str) -> None:
+        """Modification du stockage partagé : erreurs comptées, jamais propagées"""
+        try:
+            fn()
+        except Exception as e:
+            self.errors += 1
+            print(f"Erreur {action} cache partagé ({self.name}): {e}")
+
+    def store(self, key: Hashable, entry: CacheEntry) -> None:
+        generation = _new_generation()
+        name = _digest(key)
+        # Valeur sérialisée ici : l'écriture peut partir dans un autre thread
+        payload = self.codec.encode(entry.value)
+        self._background(lambda: self._write(name, generation, entry.stored_at, payload), "écriture")
+        self._remember(key, generation, entry)
+
+    def persist(self, key: Hashable, entry: CacheEntry) -> None:
+        self.store(key, entry)
+
+    def delete(self, key: Hashable) -> None:
+        self._decoded.pop(key, None)
+        name = _digest(key)
+        self._background(lambda: self._remove(name), "suppression")
+
+    def clear(self) -> None:
+        self._decoded.clear()
+        self._background(self._remove_all, "vidage")
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def _remember(self, key: Hashable, generation: int, entry: CacheEntry) -> None:
+        self._decoded[key] = (generation, entry)
+        self._decoded.move_to_end(key)
+        while len(self._decoded) > self.max_entries:
+            evicted_key, _ = self._decoded.popitem(last=False)
+            self._evicted(evicted_key)
+
+    def _forget(self, key: Hashable) -> None:
+        if self._decoded.pop(key, None) is not None:
+            self._evicted(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "decoded_entries": len(self._decoded),
+            "shared_hits": self.shared_hits,
+            "decodes": self.decodes,
+            "errors": self.errors
+        })
+        return stats
+
+
+# --- Mémoire partagée --------------------------------------------------------
+
+# Pointeur : séquence (seqlock), génération, horodatage
+_POINTER = struct.Struct("<QQd")
+_SEQUENCE = struct.Struct("<Q")
+
+
+class SharedMemoryBackend(_SharedBackend):
+    """
+    Segments multiprocessing.shared_memory partagés entre les workers d'une machine
+
+    Par clé : un segment pointeur "<prefix>_<digest>" et un segment de contenu
+    par génération "<prefix>_<digest>_<génération hex>". L'écrivain crée la
+    nouvelle génération, met à jour le pointeur (seqlock, verrou fichier entre
+    écrivains) puis supprime l'ancienne génération ; les lecteurs qui l'ont
+    encore ouverte gardent leur mapping. Les colonnes sont lues directement
+    dans le segment ; un créneau réservé y est marqué en place (visible des
+    workers qui ont la même génération ouverte) puis republié.
+
+    Les segments non rafraîchis depuis expire_after secondes sont supprimés
+    lors des écritures (balayage périodique).
+    """
+
+    name = "shm"
+
+    def __init__(
+        self,
+        max_entries: int,
+        codec: Codec,
+        prefix: Optional[str] = None,
+        expire_after: Optional[float] = None
+    ):
+        super().__init__(max_entries, codec)
+        from multiprocessing import shared_memory
+        self._shared_memory = shared_memory
+
+        self.prefix = prefix or os.getenv("SLOT_CACHE_SHM_PREFIX", "slotcache")
+        self.expire_after = expire_after if expire_after is not None else float(os.getenv("SLOT_CACHE_SHM_EXPIRE", "86400"))
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.prefix}.lock")
+        self._pointers: Dict[str, Any] = {}  # Segments pointeurs ouverts
+        self._writes = 0
+
+    def _open(self, name: str, create: bool = False, size: int = 0) -> Any:
+        """Ouvre un segment sans le confier au resource_tracker (durée de vie gérée ici)"""
+        kwargs = {"name": name, "create": create, "size": size}
+        try:
+            return self._shared_memory.SharedMemory(track=False, **kwargs)
+        except TypeError:
+            # Python < 3.13 : le resource_tracker du worker supprimerait le segment
+            # à la sortie du worker, alors que les autres workers s'en servent
+            from multiprocessing import resource_tracker
+            segment = self._shared_memory.SharedMemory(**kwargs)
+            resource_tracker.unregister(segment._name, "shared_memory")
+            return segment
+
+    def _pointer_segment(self, name: str, create: bool = False) -> Optional[Any]:
+        segment_name = f"{self.prefix}_{name}"
+        segment = self._pointers.get(segment_name)
+        if segment is not None:
+            generation = _POINTER.unpack_from(segment.buf)[1]
+            if not generation or self._payload_exists(name, generation):
+                return segment
+            # Contenu de la génération supprimé : la clé a été retirée (balayage
+            # d'un autre worker) et ce pointeur n'est plus celui des autres workers
+            self._close_pointer(segment_name)
+        try:
+            segment = self._open(segment_name)
+        except FileNotFoundError:
+            if not create:
+                return None
+            try:
+                segment = self._open(segment_name, create=True, size=_POINTER.size)
+            except FileExistsError:
+                segment = self._open(segment_name)
+        self._pointers[segment_name] = segment
+        return segment
+
+    def _read_pointer(self, name: str) -> Optional[Tuple[int, float]]:
+        segment = self._pointer_segment(name)
+        if segment is None:
+            return None
+        for _ in range(100):
+            sequence, generation, stored_at = _POINTER.unpack_from(segment.buf)
+            if sequence & 1:
+                continue  # Écriture en cours
+            if _POINTER.unpack_from(segment.buf)[0] == sequence:
+                return (generation, stored_at) if generation else None
+        return None
+
+    def _payload_exists(self, name: str, generation: int) -> bool:
+        """Le contenu d'une génération existe-t-il encore (Linux : /dev/shm) ?"""
+        if not os.path.isdir("/dev/shm"):
+            return True
+        return os.path.exists(f"/dev/shm/{self.prefix}_{name}_{generation:x}")
+
+    def _close_pointer(self, segment_name: str) -> None:
+        segment = self._pointers.pop(segment_name, None)
+        if segment is not None:
+            segment.close()
+
+    def _read_payload(self, name: str, generation: int) -> Optional[Tuple[Any, bool, Any]]:
+        try:
+            segment = self._open(f"{self.prefix}_{name}_{generation:x}")
+        except FileNotFoundError:
+            return None
+        # Le segment reste ouvert tant que les colonnes décodées (vues sur
+        # segment.buf) existent : il en est le propriétaire et se ferme avec elles.
+        # Le segment peut être arrondi à la page : le codec ne lit que sa longueur utile
+        return segment.buf, True, segment
+
+    def _write(self, name: str, generation: int, stored_at: float, payload: bytes) -> None:
+        import fcntl
+
+        segment = self._open(f"{self.prefix}_{name}_{generation:x}", create=True, size=max(len(payload), 1))
+        segment.buf[:len(payload)] = payload
+        segment.close()
+
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            pointer = self._pointer_segment(name, create=True)
+            sequence, previous, _ = _POINTER.unpack_from(pointer.buf)
+            sequence |= 1
+            _SEQUENCE.pack_into(pointer.buf, 0, sequence)  # Impair : écriture en cours
+            _POINTER.pack_into(pointer.buf, 0, sequence, generation, stored_at)
+            _SEQUENCE.pack_into(pointer.buf, 0, sequence + 1)
+
+        if previous and previous != generation:
+            self._unlink(f"{self.prefix}_{name}_{previous:x}")
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._sweep()
+
+    def _unlink(self, segment_name: str) -> None:
+        # shm_unlink direct : SharedMemory.unlink() désinscrirait une seconde fois
+        # le segment du resource_tracker (Python < 3.13)
+        posixshmem = getattr(self._shared_memory, "_posixshmem", None)
+        if posixshmem is None:
+            return  # Windows : segment libéré avec son dernier handle
+        try:
+            posixshmem.shm_unlink(f"/{segment_name}")
+        except FileNotFoundError:
+            pass
+
+    def _remove(self, name: str) -> None:
+        pointer = self._read_pointer(name)
+        if pointer is not None:
+            self._unlink(f"{self.prefix}_{name}_{pointer[0]:x}")
+        self._close_pointer(f"{self.prefix}_{name}")
+        self._unlink(f"{self.prefix}_{name}")
+
+    def _segment_names(self) -> List[str]:
+        """Segments de ce préfixe (Linux : /dev/shm)"""
+        if not os.path.isdir("/dev/shm"):
+            return []
+        return [name for name in os.listdir("/dev/shm") if name.startswith(f"{self.prefix}_")]
+
+    def _remove_all(self) -> None:
+        for segment in self._pointers.values():
+            segment.close()
+        self._pointers.clear()
+        for segment_name in self._segment_names():
+            self._unlink(segment_name)
+
+    def _sweep(self) -> None:
+        """Supprime les clés non rafraîchies depuis expire_after"""
+        now = time.time()
+        for segment_name in self._segment_names():
+            name = segment_name[len(self.prefix) + 1:]
+            if "_" in name:
+                continue  # Segment de contenu, supprimé avec son pointeur
+            pointer = self._read_pointer(name)
+            if pointer is not None and now - pointer[1] > self.expire_after:
+                self._remove(name)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["prefix"] = self.prefix
+        return stats
+
+
+# --- Protocole Redis ---------------------------------------------------------
+
+class RespError(Exception):
+    """Erreur renvoyée par le serveur (réponse -ERR)"""
+
+
+class RespConnection:
+    """Client RESP2 minimal et synchrone (GET / SET / DEL / SCAN...), utilisé depuis un seul thread"""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 0.5):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def execute(self, *args: Any) -> Any:
+        """Envoie une commande (une reconnexion en cas de connexion perdue)"""
+        for attempt in range(2):
+            if self._sock is None:
+                self._connect()
+            try:
+                return self._call(*args)
+            except (ConnectionError, socket.timeout, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def _call(self, *args: Any) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connexion fermée par le serveur")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RespError(f"Réponse inattendue: {line!r}")
+
+
+class RedisBackend(_SharedBackend):
+    """
+    Serveur parlant le protocole Redis (Redis, Valkey, KeyDB...)
+
+    Clés : "<prefix>:<digest>" → "génération:horodatage", et
+    "<prefix>:<digest>:<génération>" → colonnes sérialisées. Les deux expirent
+    après expire_after secondes sans rafraîchissement.
+
+    Les appels réseau (timeout court, serveur local attendu) passent par un
+    thread dédié, jamais par la boucle asyncio : aload attend la lecture,
+    les écritures partent en arrière-plan. load (synchrone) ne sert que les
+    générations déjà décodées dans ce processus. Après max_failures erreurs
+    de connexion consécutives, Redis n'est plus appelé pendant retry_after
+    secondes : le cache se comporte alors comme un cache par processus.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        max_entries: int,
+        codec: Codec,
+        url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        expire_after: Optional[float] = None
+    ):
+        super().__init__(max_entries, codec)
+        self.url = url or os.getenv("SLOT_CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+        self.prefix = prefix or os.getenv("SLOT_CACHE_REDIS_PREFIX", "slotcache")
+        self.expire_after = int(expire_after if expire_after is not None else float(os.getenv("SLOT_CACHE_REDIS_EXPIRE", "86400")))
+
+        parsed = urlparse(self.url)
+        self.connection = RespConnection(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=parsed.password,
+            timeout=float(os.getenv("SLOT_CACHE_REDIS_TIMEOUT", "0.5"))
+        )
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slotcache-redis")
+
+        # Suspension après des échecs de connexion répétés
+        self.max_failures = int(os.getenv("SLOT_CACHE_REDIS_MAX_FAILURES", "3"))
+        self.retry_after = float(os.getenv("SLOT_CACHE_REDIS_RETRY_AFTER", "30"))
+        self._failures = 0
+        self._suspended_until = 0.0
+        self.suspensions = 0
+
+    def available(self) -> bool:
+        """Redis appelé (False pendant une suspension après des échecs répétés)"""
+        return time.monotonic() >= self._suspended_until
+
+    def _guarded(self, fn: Callable[[], Any]) -> Any:
+        """Appel Redis dans le thread dédié, échecs de connexion consécutifs comptés"""
+        if not self.available():
+            raise ConnectionError("Redis suspendu après des échecs répétés")
+        try:
+            result = fn()
+        except OSError:
+            self._failures += 1
+            if self._failures >= self.max_failures:
+                self._suspended_until = time.monotonic() + self.retry_after
+                self.suspensions += 1
+                print(f"⚠️ Cache Redis injoignable ({self._failures} échecs), suspendu pour {self.retry_after:.0f}s")
+            raise
+        self._failures = 0
+        return result
+
+    def load(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        """Génération déjà décodée dans ce processus (aucun appel réseau)"""
+        known = self._decoded.get(key)
+        if known is None:
+            return None
+        if touch:
+            self._decoded.move_to_end(key)
+        return known[1]
+
+    async def aload(self, key: Hashable, touch: bool = True) -> Optional[CacheEntry]:
+        if not self.available():
+            return self.load(key, touch)
+        name = _digest(key)
+        known_generation = self._known_generation(key)
+        loop = asyncio.get_running_loop()
+        try:
+            found = await loop.run_in_executor(self._executor, self._guarded, lambda: self._fetch(name, known_generation))
+        except Exception as e:
+            # Redis indisponible : copie locale, comme un cache par processus
+            self.errors += 1
+            print(f"Erreur lecture cache partagé ({self.name}): {e}")
+            return self.load(key, touch)
+        return self._resolve(key, found, touch)
+
+    def _background(self, fn: Callable[[], Any], action: str) -> None:
+        """Écriture confiée au thread dédié, sans attente (ignorée pendant une suspension)"""
+        if not self.available():
+            return
+        future = self._executor.submit(self._guarded, fn)
+        future.add_done_callback(lambda done: self._report(done, action))
+
+    def _report(self, future: Any, action: str) -> None:
+        error = future.exception()
+        if error is not None:
+            self.errors += 1
+            print(f"Erreur {action} cache partagé ({self.name}): {error}")
+
+    def _read_pointer(self, name: str) -> Optional[Tuple[int, float]]:
+        value = self.connection.execute("GET", f"{self.prefix}:{name}")
+        if value is None:
+            return None
+        generation, stored_at = value.decode().split(":")
+        return int(generation), float(stored_at)
+
+    def _read_payload(self, name: str, generation: int) -> Optional[Tuple[Any, bool, Any]]:
+        payload = self.connection.execute("GET", f"{self.prefix}:{name}:{generation}")
+        if payload is None:
+            return None
+        return payload, False, None
+
+    def _write(self, name: str, generation: int, stored_at: float, payload: bytes) -> None:
+        pointer_key = f"{self.prefix}:{name}"
+        previous = self.connection.execute("GET", pointer_key)
+        self.connection.execute("SET", f"{pointer_key}:{generation}", payload, "EX", self.expire_after)
+        self.connection.execute("SET", pointer_key, f"{generation}:{stored_at!r}", "EX", self.expire_after)
+        if previous is not None:
+            previous_generation = previous.decode().split(":")[0]
+            if previous_generation != str(generation):
+                self.connection.execute("DEL", f"{pointer_key}:{previous_generation}")
+
+    def _remove(self, name: str) -> None:
+        pointer = self._read_pointer(name)
+        if pointer is not None:
+            self.connection.execute("DEL", f"{self.prefix}:{name}:{pointer[0]}")
+        self.connection.execute("DEL", f"{self.prefix}:{name}")
+
+    def _remove_all(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = self.connection.execute("SCAN", cursor, "MATCH", f"{self.prefix}:*", "COUNT", 500)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else str(cursor)
+            if keys:
+                self.connection.execute("DEL", *keys)
+            if cursor == "0":
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "url": self.url,
+            "suspended": not self.available(),
+            "suspensions": self.suspensions
+        })
+        return stats
+
+
+def create_backend(name: Optional[str], max_entries: int, codec: Codec) -> CacheBackend:
+    """Backend du cache selon SLOT_CACHE_BACKEND (memory, shm, redis)"""
+    name = (name or os.getenv("SLOT_CACHE_BACKEND", "memory")).strip().lower()
+    if name in ("shm", "shared_memory"):
+        return SharedMemoryBackend(max_entries, codec)
+    if name == "redis":
+        return RedisBackend(max_entries, codec)
+    if name not in ("memory", "in_process"):
+        print(f"Backend de cache inconnu '{name}', cache en mémoire du processus utilisé")
+    return InProcessBackend(max_entries)
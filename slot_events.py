@@ -0,0 +1,190 @@
+"""
+Événements d'invalidation des créneaux entre processus
+
+Une réservation confirmée publie un événement "slot_booked", un blocage
+temporaire "slot_held" / "slot_released" (voir slot_holds.py). Les abonnés du
+processus sont appelés immédiatement ; les autres workers (uvicorn --workers,
+plusieurs instances sur la même machine) le reçoivent par un journal JSONL
+partagé (SLOT_EVENTS_LOG) qu'ils lisent à intervalle court depuis leur
+dernière position. Sans SLOT_EVENTS_LOG, les événements restent locaux.
+
+Le journal est borné : au-delà de SLOT_EVENTS_MAX_BYTES, l'écrivain le
+renomme en SLOT_EVENTS_LOG.1 (l'ancienne génération est supprimée) et en
+recommence un vide. Chaque lecteur garde son fichier ouvert : il termine
+l'ancienne génération, même déjà renommée ou supprimée, avant de passer à la
+nouvelle. Écritures (verrou partagé) et rotation (verrou exclusif) sont
+sérialisées par SLOT_EVENTS_LOG.lock : aucun événement n'est écrit dans une
+génération après sa rotation. Seul un lecteur en retard de plus d'une
+génération (plus de SLOT_EVENTS_MAX_BYTES écrits entre deux lectures) perd
+des événements.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+SLOT_BOOKED = "slot_booked"
+SLOT_HELD = "slot_held"
+SLOT_RELEASED = "slot_released"
+
+
+class InvalidationBus:
+    """Publication / abonnement aux événements d'invalidation"""
+
+    def __init__(
+        self,
+        log_path: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.log_path = log_path if log_path is not None else os.getenv("SLOT_EVENTS_LOG", "")
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("SLOT_EVENTS_POLL_INTERVAL", "0.5"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("SLOT_EVENTS_MAX_BYTES", str(1024 * 1024)))
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._reader: Optional[BinaryIO] = None  # Génération du journal en cours de lecture
+        self._poll_task: Optional[asyncio.Task] = None
+
+        # Compteurs
+        self.published = 0
+        self.received = 0
+        self.rotations = 0
+
+    def subscribe(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Ajoute un abonné (appelé pour les événements locaux et distants)"""
+        self._subscribers.append(handler)
+
+    def publish(self, event_type: str, **payload: Any) -> Dict[str, Any]:
+        """Publie un événement : abonnés locaux puis journal partagé"""
+        event = {"type": event_type, "origin": self.origin, "at": time.time(), **payload}
+        self.published += 1
+        self._dispatch(event)
+        if self.log_path:
+            try:
+                self._append(json.dumps(event, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Erreur publication événement créneaux: {e}")
+        return event
+
+    def _append(self, line: str) -> None:
+        """Ajoute une ligne au journal partagé, puis le fait tourner s'il dépasse max_bytes"""
+        import fcntl
+
+        with open(f"{self.log_path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(line)
+                size = log.tell()
+            if size <= self.max_bytes:
+                return
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Un autre écrivain a pu faire tourner le journal entre les deux verrous
+            if os.path.getsize(self.log_path) > self.max_bytes:
+                os.replace(self.log_path, f"{self.log_path}.1")
+                self.rotations += 1
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        for handler in self._subscribers:
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Erreur abonné événement {event.get('type')}: {e}")
+
+    # --- Lecture du journal partagé ------------------------------------------
+
+    def start(self) -> None:
+        """Commence à lire le journal partagé à partir de sa fin actuelle"""
+        if not self.log_path or (self._poll_task is not None and not self._poll_task.done()):
+            return
+        if self._open_reader():
+            self._reader.seek(0, os.SEEK_END)
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _open_reader(self) -> bool:
+        """Ouvre la génération courante du journal (False si elle n'existe pas encore)"""
+        try:
+            self._reader = open(self.log_path, "rb")
+        except OSError:
+            return False
+        return True
+
+    def _rotated(self) -> bool:
+        """La génération lue n'est plus le journal courant (rotation)"""
+        try:
+            current = os.stat(self.log_path)
+        except OSError:
+            return True
+        read = os.fstat(self._reader.fileno())
+        return (current.st_ino, current.st_dev) != (read.st_ino, read.st_dev)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                self.read_new_events()
+            except Exception as e:
+                print(f"Erreur lecture événements créneaux: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def read_new_events(self) -> int:
+        """Applique les événements des autres processus ajoutés depuis la dernière lecture"""
+        if self._reader is None and not self._open_reader():
+            return 0
+
+        applied = self._read_lines()
+        # Après une rotation, plus rien n'est écrit dans l'ancienne génération :
+        # une fois lue jusqu'au bout, la lecture continue dans la nouvelle
+        while self._rotated():
+            applied += self._read_lines()
+            self._reader.close()
+            self._reader = None
+            if not self._open_reader():
+                break
+            applied += self._read_lines()
+        return applied
+
+    def _read_lines(self) -> int:
+        applied = 0
+        while True:
+            position = self._reader.tell()
+            line = self._reader.readline()
+            if not line:
+                break
+            if not line.endswith(b"\n"):
+                self._reader.seek(position)  # Ligne en cours d'écriture : relue au prochain passage
+                break
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("origin") == self.origin:
+                continue
+            self.received += 1
+            self._dispatch(event)
+            applied += 1
+        return applied
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "origin": self.origin,
+            "shared_log": self.log_path or None,
+            "published": self.published,
+            "received": self.received,
+            "rotations": self.rotations
+        }
+
+
+# Instance partagée par l'application
+slot_events = InvalidationBus()
@@ -0,0 +1,196 @@
+"""
+Blocages temporaires de créneaux entre la proposition et la réservation
+
+Un créneau proposé à un appelant (ou choisi via l'outil hold) lui est réservé
+quelques minutes : il n'apparaît plus dans les réponses des autres appelants
+le temps de recueillir nom, téléphone et immatriculation.
+
+Les échéances sont rangées dans un tas (heapq) : poser, prolonger ou libérer
+un blocage coûte O(log n) ; la purge des blocages expirés, faite à chaque
+opération, ne dépile que les échéances passées. Les entrées périmées du tas
+(blocage prolongé ou libéré) sont ignorées à la sortie et le tas est
+reconstruit quand elles deviennent majoritaires.
+
+Les blocages sont propres au processus ; backend_api les propage aux autres
+workers par le bus d'événements (slot_events).
+"""
+
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+HoldKey = Tuple[str, str]  # (center_id, slot_id)
+
+
+class SlotHold:
+    """Blocage d'un créneau par un appelant (conversation)"""
+
+    __slots__ = ("center_id", "slot_id", "owner", "expires_at", "token")
+
+    def __init__(self, center_id: str, slot_id: str, owner: str, expires_at: float, token: int):
+        self.center_id = center_id
+        self.slot_id = slot_id
+        self.owner = owner
+        self.expires_at = expires_at
+        self.token = token  # Identifie l'entrée du tas encore valide
+
+
+class SlotHolds:
+    """Blocages actifs, expirés par ordre d'échéance"""
+
+    def __init__(self, hold_seconds: Optional[float] = None):
+        self.hold_seconds = hold_seconds if hold_seconds is not None else float(os.getenv("SLOT_HOLD_SECONDS", "300"))
+
+        self._holds: Dict[HoldKey, SlotHold] = {}
+        self._by_center: Dict[str, Dict[str, SlotHold]] = {}
+        self._by_owner: Dict[str, Set[HoldKey]] = {}
+        self._heap: List[Tuple[float, int, HoldKey]] = []
+        self._tokens = itertools.count()
+
+        # Compteurs
+        self.placed = 0
+        self.refused = 0
+        self.released = 0
+        self.expired = 0
+
+    # --- Échéances -----------------------------------------------------------
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Retire les blocages expirés ; O(log n) par échéance dépilée"""
+        now = time.time() if now is None else now
+        expired = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, token, key = heapq.heappop(heap)
+            hold = self._holds.get(key)
+            if hold is not None and hold.token == token:
+                self._remove(hold)
+                expired += 1
+        self.expired += expired
+        return expired
+
+    def _push(self, hold: SlotHold) -> None:
+        heapq.heappush(self._heap, (hold.expires_at, hold.token, (hold.center_id, hold.slot_id)))
+        # Entrées périmées majoritaires : reconstruction O(n), amortie
+        if len(self._heap) > 2 * len(self._holds) + 64:
+            self._heap = [
+                (hold.expires_at, hold.token, key) for key, hold in self._holds.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _remove(self, hold: SlotHold) -> None:
+        key = (hold.center_id, hold.slot_id)
+        del self._holds[key]
+        center_holds = self._by_center[hold.center_id]
+        del center_holds[hold.slot_id]
+        if not center_holds:
+            del self._by_center[hold.center_id]
+        owner_keys = self._by_owner[hold.owner]
+        owner_keys.discard(key)
+        if not owner_keys:
+            del self._by_owner[hold.owner]
+
+    # --- Opérations ----------------------------------------------------------
+
+    def hold(
+        self,
+        center_id: str,
+        slot_id: str,
+        owner: str,
+        expires_at: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Bloque (ou prolonge) un créneau pour un appelant
+
+        Returns:
+            échéance du blocage, None si le créneau est bloqué par un autre appelant
+        """
+        now = time.time() if now is None else now
+        self.sweep(now)
+        key = (center_id, slot_id)
+        current = self._holds.get(key)
+        if current is not None and current.owner != owner:
+            self.refused += 1
+            return None
+
+        expires_at = expires_at if expires_at is not None else now + self.hold_seconds
+        token = next(self._tokens)
+        if current is not None:
+            # Prolongation : l'ancienne entrée du tas devient périmée
+            current.expires_at = expires_at
+            current.token = token
+            hold = current
+        else:
+            hold = SlotHold(center_id, slot_id, owner, expires_at, token)
+            self._holds[key] = hold
+            self._by_center.setdefault(center_id, {})[slot_id] = hold
+            self._by_owner.setdefault(owner, set()).add(key)
+        self._push(hold)
+        self.placed += 1
+        return expires_at
+
+    def release(self, center_id: str, slot_id: str, owner: Optional[str] = None) -> bool:
+        """Libère un blocage (seulement celui de `owner` si fourni)"""
+        hold = self._holds.get((center_id, slot_id))
+        if hold is None or (owner is not None and hold.owner != owner):
+            return False
+        self._remove(hold)
+        self.released += 1
+        return True
+
+    def release_owner(
+        self,
+        owner: str,
+        center_id: Optional[str] = None,
+        keep: Collection[HoldKey] = ()
+    ) -> List[HoldKey]:
+        """
+        Libère les blocages d'un appelant (fin d'appel), limités à un centre si fourni
+
+        Returns:
+            créneaux libérés, hors ceux de `keep`
+        """
+        released = [
+            key for key in self._by_owner.get(owner, ())
+            if key not in keep and (center_id is None or key[0] == center_id)
+        ]
+        for key in released:
+            self._remove(self._holds[key])
+        self.released += len(released)
+        return released
+
+    # --- Lecture -------------------------------------------------------------
+
+    def holder(self, center_id: str, slot_id: str, now: Optional[float] = None) -> Optional[str]:
+        """Appelant qui bloque le créneau, None s'il est libre"""
+        self.sweep(now)
+        hold = self._holds.get((center_id, slot_id))
+        return hold.owner if hold is not None else None
+
+    def center_holds(self, center_id: str, now: Optional[float] = None) -> Dict[str, SlotHold]:
+        """Blocages actifs du centre par slot_id (vue en lecture seule, sans copie)"""
+        self.sweep(now)
+        return self._by_center.get(center_id, {})
+
+    def __len__(self) -> int:
+        return len(self._holds)
+
+    def stats(self) -> Dict[str, Any]:
+        self.sweep()
+        return {
+            "active": len(self._holds),
+            "callers": len(self._by_owner),
+            "heap_entries": len(self._heap),
+            "hold_seconds": self.hold_seconds,
+            "placed": self.placed,
+            "refused": self.refused,
+            "released": self.released,
+            "expired": self.expired
+        }
+
+
+# Instance partagée par l'application
+slot_holds = SlotHolds()
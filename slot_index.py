@@ -0,0 +1,173 @@
+"""
+Créneaux typés et index des créneaux d'une réponse get_slots
+
+SlotRecord : créneau Simplauto parsé une seule fois, à l'ingestion
+(datetime Europe/Paris, ordinal de la date, minute du jour, demi-journée).
+
+SlotIndex : construit en une seule passe sur les SlotRecord ; chaque créneau
+formaté est rangé par date et par demi-journée.
+
+iter_half_days / records_on_day : étapes paresseuses sur un flux de
+SlotRecord trié par heure, pour ne consommer que ce qui sera prononcé.
+"""
+
+from datetime import date, datetime
+from itertools import dropwhile, groupby, takewhile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytz
+
+PARIS_TZ = pytz.timezone('Europe/Paris')
+
+MORNING = "matin"
+AFTERNOON = "après-midi"
+
+
+def parse_slot_datetime(value: str) -> datetime:
+    """
+    Parse le starts_at d'un créneau Simplauto en datetime Europe/Paris
+
+    Gère +02:00 (été), +01:00 (hiver), UTC ("Z") et les dates sans fuseau
+    (considérées comme heure de Paris).
+    """
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    slot_dt = datetime.fromisoformat(value)
+    if slot_dt.tzinfo is None:
+        return PARIS_TZ.localize(slot_dt)
+    return slot_dt.astimezone(PARIS_TZ)
+
+
+class SlotRecord:
+    """Créneau compact avec ses champs horaires précalculés"""
+
+    __slots__ = (
+        "slot_id", "starts_at", "start", "ordinal", "minute_of_day",
+        "is_morning", "duration_minutes", "price", "available"
+    )
+
+    def __init__(
+        self,
+        slot_id: str,
+        starts_at: str,
+        duration_minutes: int,
+        price: Optional[float],
+        available: bool = True
+    ):
+        self._set(slot_id, starts_at, parse_slot_datetime(starts_at), duration_minutes, price, available)
+
+    @classmethod
+    def from_datetime(
+        cls,
+        slot_id: str,
+        start: datetime,
+        duration_minutes: int,
+        price: Optional[float],
+        available: bool = True
+    ) -> "SlotRecord":
+        """Construit un créneau depuis un datetime Europe/Paris déjà calculé"""
+        record = cls.__new__(cls)
+        record._set(slot_id, start.isoformat(), start, duration_minutes, price, available)
+        return record
+
+    def _set(
+        self,
+        slot_id: str,
+        starts_at: str,
+        start: datetime,
+        duration_minutes: int,
+        price: Optional[float],
+        available: bool
+    ) -> None:
+        self.slot_id = slot_id
+        self.starts_at = starts_at
+        self.start = start
+        self.ordinal = start.toordinal()
+        self.minute_of_day = start.hour * 60 + start.minute
+        self.is_morning = start.hour < 12  # Avant 12h = matin
+        self.duration_minutes = duration_minutes
+        self.price = price
+        self.available = available
+
+    @property
+    def date(self) -> date:
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def time_text(self) -> str:
+        """Heure au format HH:MM"""
+        return f"{self.minute_of_day // 60:02d}:{self.minute_of_day % 60:02d}"
+
+    @property
+    def half_day(self) -> str:
+        return MORNING if self.is_morning else AFTERNOON
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation au format AvailableSlot"""
+        return {
+            "slot_id": self.slot_id,
+            "datetime": self.starts_at,
+            "duration_minutes": self.duration_minutes,
+            "price": self.price,
+            "available": self.available
+        }
+
+
+class SlotIndex:
+    """
+    Index par réponse : ordinal de date → créneaux,
+    (ordinal, demi-journée) → créneaux
+    """
+
+    def __init__(
+        self,
+        slots: List[SlotRecord],
+        formatter: Optional[Callable[[SlotRecord], Dict[str, Any]]] = None
+    ):
+        self.formatted: List[Any] = []
+        self.by_date: Dict[int, List[Any]] = {}
+        self.by_half_day: Dict[Tuple[int, str], List[Any]] = {}
+
+        for slot in slots:
+            entry = formatter(slot) if formatter else slot
+
+            self.formatted.append(entry)
+
+            day_slots = self.by_date.get(slot.ordinal)
+            if day_slots is None:
+                self.by_date[slot.ordinal] = day_slots = []
+            day_slots.append(entry)
+
+            half_key = (slot.ordinal, MORNING if slot.is_morning else AFTERNOON)
+            half_slots = self.by_half_day.get(half_key)
+            if half_slots is None:
+                self.by_half_day[half_key] = half_slots = []
+            half_slots.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.formatted)
+
+    def day(self, slot_date: date) -> List[Any]:
+        """Créneaux d'une date (liste vide si aucun)"""
+        return self.by_date.get(slot_date.toordinal(), [])
+
+    def half_day(self, slot_date: date, period: str) -> List[Any]:
+        """Créneaux d'une demi-journée ("matin" ou "après-midi")"""
+        return self.by_half_day.get((slot_date.toordinal(), period), [])
+
+
+def iter_half_days(records: Iterable[SlotRecord]) -> Iterator[Tuple[SlotRecord, str]]:
+    """
+    Demi-journées disponibles d'un flux trié : (premier créneau, "matin"/"après-midi")
+
+    Paresseux : la demi-journée suivante n'est lue que si elle est demandée.
+    """
+    for (_, is_morning), group in groupby(records, key=lambda slot: (slot.ordinal, slot.is_morning)):
+        yield next(group), MORNING if is_morning else AFTERNOON
+
+
+def records_on_day(records: Iterable[SlotRecord], slot_date: date) -> List[SlotRecord]:
+    """Créneaux d'une date dans un flux trié (lecture arrêtée après cette date)"""
+    ordinal = slot_date.toordinal()
+    after_start = dropwhile(lambda slot: slot.ordinal < ordinal, records)
+    return list(takewhile(lambda slot: slot.ordinal == ordinal, after_start))
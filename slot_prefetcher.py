@@ -0,0 +1,264 @@
+"""
+Préchargement des créneaux en arrière-plan
+
+Les appelants demandent presque toujours des créneaux dans les premières
+secondes de l'appel : sans préchargement, le premier get_slots est toujours un
+appel Simplauto à froid. SlotPrefetcher rafraîchit périodiquement le cache des
+centres connus (centres configurés + centres ayant reçu des appels), pendant
+leurs horaires d'ouverture, pour leurs types de véhicules courants.
+
+Un centre découvert par un appel (identifiant lu dans l'URL du webhook) n'est
+préchargé que tant qu'il a reçu des appels dans les call_window dernières
+secondes, et leur nombre est plafonné à max_centers.
+
+- fréquence adaptée au volume d'appels récent : un centre très sollicité est
+  rafraîchi toutes les min_interval secondes, un centre calme toutes les
+  max_interval secondes
+- concurrence bornée (sémaphore) et gigue sur chaque échéance pour ne pas
+  envoyer tous les rafraîchissements en même temps
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from datetime_utils import get_paris_datetime
+
+WEEKDAY_KEYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def _env_list(name: str, default: str = "") -> List[str]:
+    """Lit une liste séparée par des virgules depuis les variables d'environnement"""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def is_open(opening_hours: Optional[Dict[str, Any]], now: datetime) -> bool:
+    """
+    Le centre est-il ouvert à `now` (heure de Paris) ?
+
+    Un jour absent des horaires (ou des horaires inconnus) est considéré comme
+    fermé : pas de préchargement sans horaires.
+    """
+    if not opening_hours:
+        return False
+    day = opening_hours.get(WEEKDAY_KEYS[now.weekday()])
+    if day is None or day.get("closed"):
+        return False
+
+    current = now.strftime("%H:%M")
+    for start_key, end_key in (("morning_start", "morning_end"), ("afternoon_start", "afternoon_end")):
+        start, end = day.get(start_key), day.get(end_key)
+        if start and end and start <= current < end:
+            return True
+    return False
+
+
+class CenterSchedule:
+    """État de préchargement d'un centre"""
+
+    __slots__ = (
+        "center_id", "configured", "calls", "opening_hours", "hours_loaded_at",
+        "next_run", "last_run", "refreshes", "last_error"
+    )
+
+    def __init__(self, center_id: str, configured: bool = False):
+        self.center_id = center_id
+        self.configured = configured  # SLOT_PREFETCH_CENTERS : préchargé même sans appel
+        self.calls: Deque[float] = deque()  # Horodatages (time.monotonic) des appels récents
+        self.opening_hours: Optional[Dict[str, Any]] = None
+        self.hours_loaded_at: Optional[float] = None
+        self.next_run = 0.0
+        self.last_run: Optional[float] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+
+class SlotPrefetcher:
+    """Planificateur de rafraîchissement du cache de créneaux, par centre"""
+
+    def __init__(
+        self,
+        refresh: Callable[[str, str], Awaitable[None]],
+        get_center_data: Callable[[str], Awaitable[Dict[str, Any]]],
+        cache_age: Callable[[str, str], Optional[float]],
+        enabled: Optional[bool] = None,
+        centers: Optional[List[str]] = None,
+        vehicle_types: Optional[List[str]] = None
+    ):
+        self.refresh = refresh
+        self.get_center_data = get_center_data
+        self.cache_age = cache_age
+
+        self.enabled = enabled if enabled is not None else os.getenv("SLOT_PREFETCH", "true").lower() in ("1", "true", "yes", "on")
+        self.vehicle_types = vehicle_types or _env_list("SLOT_PREFETCH_VEHICLE_TYPES", "voiture_particuliere")
+        self.min_interval = float(os.getenv("SLOT_PREFETCH_MIN_INTERVAL", "25"))
+        self.max_interval = float(os.getenv("SLOT_PREFETCH_MAX_INTERVAL", "120"))
+        self.call_window = float(os.getenv("SLOT_PREFETCH_CALL_WINDOW", "900"))
+        self.max_centers = int(os.getenv("SLOT_PREFETCH_MAX_CENTERS", "200"))
+        self.concurrency = int(os.getenv("SLOT_PREFETCH_CONCURRENCY", "4"))
+        self.jitter = float(os.getenv("SLOT_PREFETCH_JITTER", "0.1"))
+        self.tick = float(os.getenv("SLOT_PREFETCH_TICK", "5"))
+        self.hours_ttl = 3600.0
+
+        self._centers: Dict[str, CenterSchedule] = {}
+        for center_id in centers if centers is not None else _env_list("SLOT_PREFETCH_CENTERS"):
+            self.add_center(center_id, configured=True)
+        self.ignored_calls = 0  # Appels de centres inconnus refusés (plafond atteint)
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    # --- Centres et volume d'appels ------------------------------------------
+
+    def add_center(self, center_id: str, configured: bool = False) -> CenterSchedule:
+        schedule = self._centers.get(center_id)
+        if schedule is None:
+            schedule = self._centers[center_id] = CenterSchedule(center_id, configured)
+            # Première échéance étalée pour ne pas rafraîchir tous les centres ensemble
+            schedule.next_run = time.monotonic() + random.uniform(0, self.tick)
+        elif configured:
+            schedule.configured = True
+        return schedule
+
+    def record_call(self, center_id: str) -> None:
+        """
+        Enregistre un appel get_slots (le centre devient préchargé)
+
+        Un centre inconnu n'est pas ajouté si max_centers centres découverts
+        par des appels récents sont déjà suivis.
+        """
+        now = time.monotonic()
+        if center_id not in self._centers:
+            self._forget_idle_centers(now)
+            discovered = sum(1 for schedule in self._centers.values() if not schedule.configured)
+            if discovered >= self.max_centers:
+                self.ignored_calls += 1
+                return
+        schedule = self.add_center(center_id)
+        schedule.calls.append(now)
+        self._trim_calls(schedule, now)
+
+    def _trim_calls(self, schedule: CenterSchedule, now: float) -> None:
+        while schedule.calls and now - schedule.calls[0] > self.call_window:
+            schedule.calls.popleft()
+
+    def _forget_idle_centers(self, now: float) -> None:
+        """Oublie les centres non configurés sans appel depuis call_window secondes"""
+        for center_id, schedule in list(self._centers.items()):
+            self._trim_calls(schedule, now)
+            if not schedule.configured and not schedule.calls:
+                del self._centers[center_id]
+
+    def interval(self, schedule: CenterSchedule) -> float:
+        """Période de rafraîchissement : max_interval / (1 + appels récents), bornée par min_interval"""
+        self._trim_calls(schedule, time.monotonic())
+        return max(self.min_interval, self.max_interval / (1 + len(schedule.calls)))
+
+    # --- Boucle ------------------------------------------------------------
+
+    def start(self) -> None:
+        """Démarre la boucle de préchargement (appelé au démarrage de l'application)"""
+        if not self.enabled or (self._loop_task is not None and not self._loop_task.done()):
+            return
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la boucle et les rafraîchissements en cours"""
+        tasks = [task for task in (self._loop_task, *self._running) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._running.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                print(f"Erreur préchargement créneaux: {e}")
+            await asyncio.sleep(self.tick)
+
+    async def run_due(self) -> int:
+        """Lance les rafraîchissements arrivés à échéance ; retourne leur nombre"""
+        now = time.monotonic()
+        paris_now = get_paris_datetime()
+        started = 0
+        self._forget_idle_centers(now)
+        for schedule in list(self._centers.values()):
+            if schedule.next_run > now:
+                continue
+            interval = self.interval(schedule)
+            schedule.next_run = now + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+            await self._load_hours(schedule, now)
+            if not is_open(schedule.opening_hours, paris_now):
+                continue
+
+            task = asyncio.create_task(self._refresh_center(schedule))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            started += 1
+        return started
+
+    async def _load_hours(self, schedule: CenterSchedule, now: float) -> None:
+        if schedule.hours_loaded_at is not None and now - schedule.hours_loaded_at < self.hours_ttl:
+            return
+        try:
+            center_data = await self.get_center_data(schedule.center_id)
+            schedule.opening_hours = center_data.get("opening_hours")
+            schedule.hours_loaded_at = now
+        except Exception as e:
+            schedule.last_error = f"horaires: {e}"
+
+    async def _refresh_center(self, schedule: CenterSchedule) -> None:
+        async with self._semaphore:
+            for vehicle_type in self.vehicle_types:
+                try:
+                    await self.refresh(schedule.center_id, vehicle_type)
+                    schedule.refreshes += 1
+                    schedule.last_error = None
+                except Exception as e:
+                    schedule.last_error = f"{vehicle_type}: {e}"
+                    print(f"Erreur préchargement créneaux {schedule.center_id} ({vehicle_type}): {e}")
+            schedule.last_run = time.monotonic()
+
+    # --- Statut ------------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        """État du préchargement et âge du cache par centre"""
+        now = time.monotonic()
+        paris_now = get_paris_datetime()
+        centers = {}
+        for center_id, schedule in self._centers.items():
+            self._trim_calls(schedule, now)
+            cache_ages = {}
+            for vehicle_type in self.vehicle_types:
+                age = self.cache_age(center_id, vehicle_type)
+                cache_ages[vehicle_type] = round(age, 1) if age is not None else None
+            centers[center_id] = {
+                "configured": schedule.configured,
+                "open_now": is_open(schedule.opening_hours, paris_now),
+                "recent_calls": len(schedule.calls),
+                "interval_seconds": round(self.interval(schedule), 1),
+                "next_run_in_seconds": round(max(0.0, schedule.next_run - now), 1),
+                "last_run_seconds_ago": round(now - schedule.last_run, 1) if schedule.last_run is not None else None,
+                "refreshes": schedule.refreshes,
+                "last_error": schedule.last_error,
+                "cache_age_seconds": cache_ages
+            }
+        return {
+            "enabled": self.enabled,
+            "running": self._loop_task is not None and not self._loop_task.done(),
+            "in_flight": len(self._running),
+            "concurrency": self.concurrency,
+            "max_centers": self.max_centers,
+            "ignored_calls": self.ignored_calls,
+            "vehicle_types": self.vehicle_types,
+            "centers": centers
+        }
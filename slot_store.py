@@ -0,0 +1,280 @@
+"""
+Stockage colonnaire des créneaux d'un centre
+
+Au lieu d'un objet par créneau, SlotColumns garde des tableaux parallèles
+(module array) : minutes epoch UTC, ordinal de la date à Paris, minute du
+jour, prix en centimes, durée, identifiants internés et un masque de bits de
+disponibilité. Les filtres travaillent sur des tableaux entiers : fenêtre de
+dates par dichotomie sur les ordinaux triés, preferred_time par un masque de
+bits précalculé combiné (entiers Python) au masque de disponibilité. Seules
+les lignes retenues sont parcourues et matérialisées en SlotRecord. Les
+lignes sont rangées par ordre chronologique.
+
+to_bytes / from_buffer : format binaire partagé entre workers (mémoire
+partagée, Redis). Les colonnes numériques relues depuis un buffer sont des
+memoryview sur ce buffer, sans copie.
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from slot_index import PARIS_TZ, SlotRecord, parse_slot_datetime
+
+NO_PRICE = -1
+
+# En-tête du format binaire : magic, nombre de lignes, taille des identifiants
+_HEADER = struct.Struct("<4sII4x")
+_MAGIC = b"SLC1"
+_ID_SEPARATOR = "\x1f"
+# Colonnes numériques dans l'ordre du format (itemsize décroissant : pas de désalignement)
+_NUMERIC_COLUMNS = (
+    ("epoch_minutes", "q"),
+    ("ordinals", "l"),
+    ("price_cents", "l"),
+    ("minutes_of_day", "H"),
+    ("durations", "H")
+)
+
+# Positions des bits à 1 de chaque octet (lecture des masques octet par octet)
+_BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+# Bornes horaires de preferred_time (minutes du jour, bornes incluses)
+PREFERRED_TIME_RANGES = {
+    "morning": (8 * 60, 12 * 60 + 59),     # 8h <= heure <= 12h
+    "afternoon": (13 * 60, 18 * 60 + 59)   # 13h <= heure <= 18h
+}
+
+
+def _price_from_cents(price_cents: int) -> Optional[float]:
+    """Prix en euros (entier si rond, comme renvoyé par Simplauto)"""
+    if price_cents == NO_PRICE:
+        return None
+    if price_cents % 100 == 0:
+        return price_cents // 100
+    return price_cents / 100
+
+
+class SlotColumns:
+    """Créneaux d'une réponse Simplauto en tableaux parallèles"""
+
+    __slots__ = (
+        "epoch_minutes", "ordinals", "minutes_of_day", "price_cents",
+        "durations", "slot_ids", "available_bits", "_rows_by_id", "_time_masks", "_buffer_owner"
+    )
+
+    def __init__(self):
+        self.epoch_minutes = array("q")
+        self.ordinals = array("l")
+        self.minutes_of_day = array("H")
+        self.price_cents = array("l")
+        self.durations = array("H")
+        self.slot_ids: List[str] = []
+        self.available_bits = bytearray()
+        self._rows_by_id: Dict[str, int] = {}
+        self._time_masks: Dict[str, int] = {}  # preferred_time → masque des lignes (bit n = ligne n)
+        # Objet propriétaire du buffer (segment partagé) quand les colonnes sont des vues
+        self._buffer_owner: Any = None
+
+    def __len__(self) -> int:
+        return len(self.slot_ids)
+
+    def __del__(self):
+        # Les __slots__ sont vidés par ordre alphabétique (_buffer_owner en premier) :
+        # les vues sont relâchées ici pour que le segment partagé se ferme après elles
+        if getattr(self, "_buffer_owner", None) is not None:
+            for name, _ in _NUMERIC_COLUMNS:
+                delattr(self, name)
+            del self.available_bits
+            self._buffer_owner = None
+
+    def append(
+        self,
+        slot_id: str,
+        start: datetime,
+        duration_minutes: int,
+        price: Optional[float],
+        available: bool = True
+    ) -> None:
+        """Ajoute un créneau (start : datetime Europe/Paris)"""
+        row = len(self.slot_ids)
+        slot_id = sys.intern(str(slot_id))
+        self.epoch_minutes.append(int(start.timestamp()) // 60)
+        self.ordinals.append(start.toordinal())
+        self.minutes_of_day.append(start.hour * 60 + start.minute)
+        self.price_cents.append(NO_PRICE if price is None else int(round(price * 100)))
+        self.durations.append(duration_minutes)
+        self.slot_ids.append(slot_id)
+        if row % 8 == 0:
+            self.available_bits.append(0)
+        if available:
+            self.available_bits[row >> 3] |= 1 << (row & 7)
+        self._rows_by_id.setdefault(slot_id, row)
+        self._time_masks.clear()
+
+    @classmethod
+    def from_api(cls, real_slots_data: Iterable[Dict[str, Any]], duration_minutes: int = 50) -> "SlotColumns":
+        """
+        Construit les colonnes depuis la réponse JSON Simplauto
+
+        Un seul parsing par créneau ; les lignes sont triées par heure de
+        début pour que les lectures en flux puissent s'arrêter tôt.
+        """
+        parsed = []
+        for slot_data in real_slots_data:
+            available = slot_data.get("is_available", True)
+            starts_at = slot_data.get("starts_at")
+            if not available or not starts_at:
+                continue
+            parsed.append((parse_slot_datetime(starts_at), slot_data))
+        parsed.sort(key=lambda item: item[0])
+
+        columns = cls()
+        for start, slot_data in parsed:
+            columns.append(
+                slot_id=slot_data.get("id", "unknown"),
+                start=start,
+                duration_minutes=duration_minutes,
+                price=slot_data.get("price"),
+                available=slot_data.get("is_available", True)
+            )
+        return columns
+
+    # --- Format binaire ---------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """Sérialise les colonnes (format relu par from_buffer)"""
+        ids_blob = _ID_SEPARATOR.join(self.slot_ids).encode("utf-8")
+        parts = [_HEADER.pack(_MAGIC, len(self.slot_ids), len(ids_blob))]
+        parts.extend(bytes(getattr(self, name)) for name, _ in _NUMERIC_COLUMNS)
+        parts.append(bytes(self.available_bits))
+        parts.append(ids_blob)
+        return b"".join(parts)
+
+    @classmethod
+    def from_buffer(cls, buffer: Any, writable: bool = False, owner: Any = None) -> "SlotColumns":
+        """
+        Relit des colonnes sérialisées par to_bytes
+
+        Les colonnes numériques sont des vues sur `buffer` (sans copie). Si
+        `writable`, le masque de disponibilité est lui aussi une vue : un
+        mark_unavailable modifie directement le buffer (segment partagé).
+        Sinon il est copié pour rester modifiable localement.
+        `owner` garde en vie l'objet qui possède le buffer.
+        """
+        view = memoryview(buffer).cast("B")
+        magic, rows, ids_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError("Format de créneaux inconnu")
+
+        columns = cls.__new__(cls)
+        offset = _HEADER.size
+        for name, typecode in _NUMERIC_COLUMNS:
+            size = array(typecode).itemsize * rows
+            setattr(columns, name, view[offset:offset + size].cast(typecode))
+            offset += size
+
+        bits_size = (rows + 7) // 8
+        bits = view[offset:offset + bits_size]
+        columns.available_bits = bits if writable else bytearray(bits)
+        offset += bits_size
+
+        ids_blob = bytes(view[offset:offset + ids_size]).decode("utf-8")
+        columns.slot_ids = [sys.intern(slot_id) for slot_id in ids_blob.split(_ID_SEPARATOR)] if rows else []
+        columns._rows_by_id = {}
+        for row, slot_id in enumerate(columns.slot_ids):
+            columns._rows_by_id.setdefault(slot_id, row)
+        columns._time_masks = {}
+        columns._buffer_owner = owner
+        return columns
+
+    # --- Disponibilité ---------------------------------------------------
+
+    def is_available(self, row: int) -> bool:
+        return bool(self.available_bits[row >> 3] & (1 << (row & 7)))
+
+    def mark_unavailable(self, slot_id: str) -> bool:
+        """Retire un créneau des résultats sans reconstruire les colonnes"""
+        row = self._rows_by_id.get(slot_id)
+        if row is None or not self.is_available(row):
+            return False
+        self.available_bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+        return True
+
+    def row_of(self, slot_id: str) -> Optional[int]:
+        return self._rows_by_id.get(slot_id)
+
+    # --- Filtres ---------------------------------------------------------
+
+    def iter_rows(
+        self,
+        preferred_time: str = "any",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Iterator[int]:
+        """
+        Lignes disponibles correspondant aux filtres, produites une à une dans
+        l'ordre chronologique, pour les consommateurs qui s'arrêtent tôt
+
+        Filtrage sur des tableaux entiers : la fenêtre de dates est bornée
+        par dichotomie sur les ordinaux triés, puis le masque de disponibilité
+        est combiné (ET binaire) au masque précalculé de preferred_time. Seuls
+        les bits restants sont parcourus, octet par octet.
+
+        Args:
+            preferred_time: "any", "morning" (8h-12h) ou "afternoon" (13h-18h)
+            start_date / end_date: fenêtre de dates à Paris (bornes incluses)
+        """
+        ordinals = self.ordinals
+        first = bisect_left(ordinals, start_date.toordinal()) if start_date else 0
+        last = bisect_right(ordinals, end_date.toordinal()) if end_date else len(ordinals)
+        if first >= last:
+            return
+
+        mask = int.from_bytes(self.available_bits, "little")
+        if preferred_time in PREFERRED_TIME_RANGES:
+            mask &= self._time_mask(preferred_time)
+        width = last - first
+        mask = (mask >> first) & ((1 << width) - 1)
+        if not mask:
+            return
+
+        for index, byte in enumerate(mask.to_bytes((width + 7) // 8, "little")):
+            if byte:
+                base = first + (index << 3)
+                for bit in _BIT_POSITIONS[byte]:
+                    yield base + bit
+
+    def _time_mask(self, preferred_time: str) -> int:
+        """Masque des lignes dans la plage horaire (calculé une fois par instance)"""
+        mask = self._time_masks.get(preferred_time)
+        if mask is None:
+            low, high = PREFERRED_TIME_RANGES[preferred_time]
+            bits = bytearray((len(self.minutes_of_day) + 7) // 8)
+            for row, minute in enumerate(self.minutes_of_day):
+                if low <= minute <= high:
+                    bits[row >> 3] |= 1 << (row & 7)
+            mask = self._time_masks[preferred_time] = int.from_bytes(bits, "little")
+        return mask
+
+    # --- Matérialisation ---------------------------------------------------
+
+    def record(self, row: int) -> SlotRecord:
+        """SlotRecord d'une ligne (sans re-parsing de chaîne)"""
+        start = datetime.fromtimestamp(self.epoch_minutes[row] * 60, PARIS_TZ)
+        price_cents = self.price_cents[row]
+        return SlotRecord.from_datetime(
+            slot_id=self.slot_ids[row],
+            start=start,
+            duration_minutes=self.durations[row],
+            price=_price_from_cents(price_cents),
+            available=self.is_available(row)
+        )
+
+    def iter_records(self, rows: Iterable[int]) -> Iterator[SlotRecord]:
+        """SlotRecord matérialisés à la demande"""
+        for row in rows:
+            yield self.record(row)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Serveurs de remplacement locaux pour Simplauto et ElevenLabs (essais hors ligne)
+
+Une application ASGI qui imite les routes utilisées par le backend :
+
+- Simplauto : GET /private-api/slots/ (fenêtre start_date / end_date
+  appliquée) et POST /private-api/bookings/ (409 si le créneau est déjà pris)
+- ElevenLabs : POST /v1/convai/agents, GET / PATCH / DELETE
+  /v1/convai/agents/{agent_id} (agents gardés en mémoire)
+- GET /standin/stats : appels, erreurs injectées, réservations, agents
+
+Chaque API a ses réglages, lus dans l'environnement (préfixes
+STANDIN_SIMPLAUTO_ et STANDIN_ELEVENLABS_) :
+
+- LATENCY : "fixed:20", "uniform:10:80", "lognormal:40:0.6" (médiane en ms,
+  sigma) ou "exponential:30" (moyenne en ms) ; "0" = aucune latence
+- ERROR_RATE / ERROR_STATUS : part des appels en erreur et code renvoyé
+- CALENDAR : "regular", "busy" (70 % des créneaux déjà pris), "sparse"
+  (un jour sur cinq) ou "empty" ; SLOTS_PER_DAY, HORIZON_DAYS
+- PAYLOAD_PADDING : octets ajoutés à chaque créneau (réponses plus lourdes)
+- SEED : graine (calendriers et erreurs reproductibles)
+
+Utilisation hors ligne du backend et des benchmarks :
+
+    python standin_servers.py --port 8100
+    SIMPLAUTO_BASE_URL=http://127.0.0.1:8100 ELEVENLABS_BASE_URL=http://127.0.0.1:8100 uvicorn backend_api:app
+
+ou dans le processus, sans réseau : httpx.ASGITransport(app=create_standin_app()).
+
+Benchmarks : serve_standin() sert l'application sur un port libre le temps
+d'un bloc ; free_port() et percentile() sont partagés par les scripts.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+
+from slot_index import PARIS_TZ
+
+CALENDARS = ("regular", "busy", "sparse", "empty")
+
+
+# --- Réglages ------------------------------------------------------------------
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Loi de latence décrite par "loi:paramètres" (ms) → tirage en secondes"""
+    spec = (spec or "0").strip()
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(value) for value in args.split(":")] if args else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0] / 1000
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1]) / 1000
+        if kind == "lognormal" and len(values) == 2:
+            median, sigma = values
+            return lambda rng: median * math.exp(rng.gauss(0.0, sigma)) / 1000
+        if kind == "exponential" and len(values) == 1 and values[0] > 0:
+            return lambda rng: rng.expovariate(1 / values[0]) / 1000
+        if not args:
+            fixed = float(kind) / 1000  # Nombre seul : latence fixe en ms ("0" = aucune)
+            return lambda rng: fixed
+    except ValueError:
+        pass
+    raise ValueError(f"Loi de latence inconnue : {spec}")
+
+
+class StandinSettings:
+    """Latence, erreurs et calendrier d'une API simulée"""
+
+    def __init__(
+        self,
+        prefix: str = "STANDIN",
+        latency: Optional[str] = None,
+        error_rate: Optional[float] = None,
+        error_status: Optional[int] = None,
+        calendar: Optional[str] = None,
+        slots_per_day: Optional[int] = None,
+        horizon_days: Optional[int] = None,
+        payload_padding: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        def setting(name: str, default: str) -> str:
+            return os.getenv(f"{prefix}_{name}", default)
+
+        self.latency_spec = latency if latency is not None else setting("LATENCY", "0")
+        self.latency = parse_latency(self.latency_spec)
+        self.error_rate = error_rate if error_rate is not None else float(setting("ERROR_RATE", "0"))
+        self.error_status = error_status if error_status is not None else int(setting("ERROR_STATUS", "503"))
+        self.calendar = calendar if calendar is not None else setting("CALENDAR", "regular")
+        if self.calendar not in CALENDARS:
+            raise ValueError(f"Calendrier inconnu : {self.calendar} (choix : {', '.join(CALENDARS)})")
+        self.slots_per_day = slots_per_day if slots_per_day is not None else int(setting("SLOTS_PER_DAY", "20"))
+        self.horizon_days = horizon_days if horizon_days is not None else int(setting("HORIZON_DAYS", "60"))
+        self.payload_padding = payload_padding if payload_padding is not None else int(setting("PAYLOAD_PADDING", "0"))
+        self.seed = seed if seed is not None else int(setting("SEED", "42"))
+        self.rng = random.Random(self.seed)
+
+    def set_latency(self, latency: Union[str, Callable[[random.Random], float]]) -> None:
+        """Change la loi de latence en cours d'essai (description, ou tirage rng → secondes)"""
+        if callable(latency):
+            self.latency_spec = getattr(latency, "__name__", "custom")
+            self.latency = latency
+        else:
+            self.latency_spec = latency
+            self.latency = parse_latency(latency)
+
+    async def delay(self) -> None:
+        seconds = self.latency(self.rng)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def failed(self) -> bool:
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+
+# --- Calendriers de créneaux ---------------------------------------------------
+
+def standin_slot_id(center_id: str, day: date, minutes: int) -> str:
+    """Identifiant d'un créneau simulé (centre, jour, minutes depuis minuit)"""
+    return f"{center_id}-{day:%Y%m%d}-{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def slot_calendar(
+    kind: str,
+    center_id: str,
+    first_day: date,
+    horizon_days: int,
+    slots_per_day: int,
+    seed: int = 42,
+    padding: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Créneaux libres d'un centre, lundi-samedi 8h-18h, au format Simplauto
+
+    Le tirage ne dépend que de (seed, centre, premier jour) : deux appels
+    identiques renvoient le même calendrier.
+    """
+    if kind == "empty" or slots_per_day <= 0:
+        return []
+    rng = random.Random(f"{seed}:{center_id}:{first_day.isoformat()}")
+    step = max(1, 600 // slots_per_day)
+    details = "x" * padding
+    slots = []
+    for offset in range(horizon_days):
+        day = first_day + timedelta(days=offset)
+        if day.weekday() == 6 or (kind == "sparse" and offset % 5):
+            continue
+        for rank in range(slots_per_day):
+            minutes = 8 * 60 + rank * step
+            if minutes >= 18 * 60 or (kind == "busy" and rng.random() < 0.7):
+                continue
+            starts_at = PARIS_TZ.localize(datetime(day.year, day.month, day.day, minutes // 60, minutes % 60))
+            slot = {
+                "id": standin_slot_id(center_id, day, minutes),
+                "starts_at": starts_at.isoformat(),
+                "price": 78,
+                "is_available": True
+            }
+            if padding:
+                slot["details"] = details
+            slots.append(slot)
+    return slots
+
+
+# --- Application -----------------------------------------------------------------
+
+def create_standin_app(
+    simplauto_settings: Optional[StandinSettings] = None,
+    elevenlabs_settings: Optional[StandinSettings] = None,
+    today: Optional[Callable[[], date]] = None
+) -> FastAPI:
+    """
+    Application de remplacement (Simplauto et ElevenLabs sur le même serveur)
+
+    Args:
+        today: date de Paris du calendrier (horloge figée des benchmarks) ;
+               par défaut la date courante
+    """
+    simplauto = simplauto_settings or StandinSettings("STANDIN_SIMPLAUTO")
+    elevenlabs = elevenlabs_settings or StandinSettings("STANDIN_ELEVENLABS")
+    today = today or (lambda: datetime.now(PARIS_TZ).date())
+
+    standin = FastAPI(title="Simplauto / ElevenLabs stand-in")
+    calls: Counter = Counter()
+    errors: Counter = Counter()
+    calendars: Dict[Tuple[str, str, date], List[Dict[str, Any]]] = {}
+    starts_by_slot: Dict[str, str] = {}
+    booked: Dict[str, Dict[str, Any]] = {}
+    agents: Dict[str, Dict[str, Any]] = {}
+
+    async def simulate(settings: StandinSettings, route: str) -> None:
+        """Latence puis, éventuellement, erreur injectée"""
+        calls[route] += 1
+        await settings.delay()
+        if settings.failed():
+            errors[route] += 1
+            raise HTTPException(status_code=settings.error_status, detail="Erreur simulée")
+
+    def calendar_for(center_id: str, vehicle_type: str) -> List[Dict[str, Any]]:
+        key = (center_id, vehicle_type, today())
+        slots = calendars.get(key)
+        if slots is None:
+            slots = calendars[key] = slot_calendar(
+                simplauto.calendar,
+                center_id,
+                key[2] + timedelta(days=1),
+                simplauto.horizon_days,
+                simplauto.slots_per_day,
+                simplauto.seed,
+                simplauto.payload_padding
+            )
+            starts_by_slot.update((slot["id"], slot["starts_at"]) for slot in slots)
+        return slots
+
+    # --- Simplauto ---
+
+    @standin.get("/private-api/slots/")
+    async def get_slots(
+        center_id: str,
+        vehicle_type: str = "1",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ):
+        await simulate(simplauto, "simplauto.slots")
+        return [
+            slot for slot in calendar_for(center_id, vehicle_type)
+            if slot["id"] not in booked
+            and (not start_date or slot["starts_at"][:10] >= start_date)
+            and (not end_date or slot["starts_at"][:10] <= end_date)
+        ]
+
+    @standin.post("/private-api/bookings/", status_code=201)
+    async def create_booking(request: Request):
+        await simulate(simplauto, "simplauto.bookings")
+        payload = await request.json()
+        slot_id = payload.get("slot")
+        if not slot_id:
+            raise HTTPException(status_code=400, detail="slot manquant")
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if slot_id in booked:
+            # Réservation renvoyée avec la même clé : réponse d'origine, pas de doublon
+            if idempotency_key and booked[slot_id]["idempotency_key"] == idempotency_key:
+                return booked[slot_id]
+            raise HTTPException(status_code=409, detail="Créneau déjà réservé")
+        booking = booked[slot_id] = {
+            "id": f"sa-{len(booked) + 1}",
+            "slot": slot_id,
+            "reference": payload.get("reference"),
+            "idempotency_key": idempotency_key,
+            "starts_at": starts_by_slot.get(slot_id),
+            "status": "confirmed"
+        }
+        return booking
+
+    # --- ElevenLabs ---
+
+    def check_key(api_key: Optional[str]) -> None:
+        if not api_key:
+            raise HTTPException(status_code=401, detail="xi-api-key manquante")
+
+    def agent_or_404(agent_id: str) -> Dict[str, Any]:
+        agent = agents.get(agent_id)
+        if agent is None:
+            raise HTTPException(status_code=404, detail=f"Agent {agent_id} introuvable")
+        return agent
+
+    @standin.post("/v1/convai/agents", status_code=201)
+    async def create_agent(request: Request, xi_api_key: Optional[str] = Header(None)):
+        check_key(xi_api_key)
+        await simulate(elevenlabs, "elevenlabs.create")
+        config = await request.json()
+        agent_id = f"agent_standin_{len(agents) + 1:05d}"
+        agents[agent_id] = {"agent_id": agent_id, "name": config.get("name", agent_id), **config}
+        return agents[agent_id]
+
+    @standin.get("/v1/convai/agents/{agent_id}")
+    async def get_agent(agent_id: str, xi_api_key: Optional[str] = Header(None)):
+        check_key(xi_api_key)
+        await simulate(elevenlabs, "elevenlabs.get")
+        return agent_or_404(agent_id)
+
+    @standin.patch("/v1/convai/agents/{agent_id}")
+    async def update_agent(agent_id: str, request: Request, xi_api_key: Optional[str] = Header(None)):
+        check_key(xi_api_key)
+        await simulate(elevenlabs, "elevenlabs.update")
+        agent = agent_or_404(agent_id)
+        agent.update(await request.json())
+        return agent
+
+    @standin.delete("/v1/convai/agents/{agent_id}", status_code=204)
+    async def delete_agent(agent_id: str, xi_api_key: Optional[str] = Header(None)):
+        check_key(xi_api_key)
+        await simulate(elevenlabs, "elevenlabs.delete")
+        agent_or_404(agent_id)
+        del agents[agent_id]
+        return Response(status_code=204)
+
+    # --- Suivi ---
+
+    @standin.get("/standin/stats")
+    async def stats():
+        return {
+            "calls": dict(calls),
+            "injected_errors": dict(errors),
+            "bookings": len(booked),
+            "agents": len(agents),
+            "simplauto": {"latency": simplauto.latency_spec, "error_rate": simplauto.error_rate, "calendar": simplauto.calendar},
+            "elevenlabs": {"latency": elevenlabs.latency_spec, "error_rate": elevenlabs.error_rate}
+        }
+
+    standin.state.bookings = booked
+    standin.state.agents = agents
+    return standin
+
+
+# --- Outils des benchmarks -------------------------------------------------------
+
+def free_port() -> int:
+    """Port TCP libre sur 127.0.0.1"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Centile par rang le plus proche"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+
+@asynccontextmanager
+async def serve_standin(app: Any, port: Optional[int] = None) -> AsyncIterator[str]:
+    """Sert l'application (uvicorn, 127.0.0.1) le temps du bloc ; rend son URL de base"""
+    import uvicorn
+
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        if server_task.done():
+            server_task.result()  # Démarrage impossible (port pris) : erreur remontée
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serveurs Simplauto / ElevenLabs de remplacement")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("STANDIN_PORT", "8100")))
+    arguments = parser.parse_args()
+    print(f"🧪 Simplauto et ElevenLabs simulés sur http://{arguments.host}:{arguments.port}")
+    uvicorn.run(create_standin_app(), host=arguments.host, port=arguments.port, log_level="warning")
@@ -0,0 +1,158 @@
+"""
+Mesure des étapes des webhooks et histogrammes Prometheus
+
+Chaque appel webhook mesuré porte un StageTimer dans une ContextVar : les
+étapes (résolution du jour, lecture du cache, appel Simplauto, parsing JSON,
+formatage...) s'y ajoutent avec perf_counter_ns, y compris depuis le code
+appelé (MockDatabase, tâches créées pendant l'appel). Hors appel mesuré, un
+span ne fait rien. Les étapes peuvent s'imbriquer (window contient cache, qui
+contient upstream) : chaque durée est inclusive. Les rafraîchissements de
+fond du cache (voir slot_cache.py) ne sont rattachés à aucun appel.
+
+En fin d'appel, les durées alimentent un histogramme Prometheus (étiquettes
+stage, center_id, vehicle_type, branch) exposé sur /metrics, et l'en-tête
+Server-Timing de la réponse.
+"""
+
+import bisect
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StageTimer:
+    """Durées cumulées par étape d'un appel (nanosecondes)"""
+
+    __slots__ = ("started_ns", "total_ns", "stages")
+
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.total_ns: Optional[int] = None
+        self.stages: Dict[str, int] = {}
+
+    def add(self, stage: str, elapsed_ns: int) -> None:
+        self.stages[stage] = self.stages.get(stage, 0) + elapsed_ns
+
+    def stop(self) -> int:
+        self.total_ns = time.perf_counter_ns() - self.started_ns
+        return self.total_ns
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (millisecondes)"""
+        entries = [f"{stage};dur={elapsed_ns / 1e6:.3f}" for stage, elapsed_ns in self.stages.items()]
+        if self.total_ns is not None:
+            entries.append(f"total;dur={self.total_ns / 1e6:.3f}")
+        return ", ".join(entries)
+
+
+current_timer: ContextVar[Optional[StageTimer]] = ContextVar("current_timer", default=None)
+
+
+class span:
+    """
+    Mesure un bloc dans l'appel en cours :
+
+        with span("upstream"):
+            ...
+    """
+
+    __slots__ = ("timer", "stage", "started_ns")
+
+    def __init__(self, stage: str):
+        self.timer = current_timer.get()
+        self.stage = stage
+
+    def __enter__(self) -> "span":
+        if self.timer is not None:
+            self.started_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.timer is not None:
+            self.timer.add(self.stage, time.perf_counter_ns() - self.started_ns)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{value:.1f}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Histogramme Prometheus à étiquettes (format d'exposition texte 0.0.4)"""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: Optional[int] = None
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Les étiquettes viennent des requêtes (center_id) : nombre de séries borné
+        self.max_series = max_series if max_series is not None else int(os.getenv("METRICS_MAX_SERIES", "5000"))
+        # étiquettes → [compteurs par intervalle (+Inf en dernier), somme, nombre]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self.dropped = 0
+
+    def observe(self, value: float, labels: Tuple[str, ...]) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            if len(self._series) >= self.max_series:
+                self.dropped += 1
+                return
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+class StageMetrics:
+    """Durées des étapes des webhooks, par centre, type de véhicule et branche"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = enabled if enabled is not None else os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+        self.histogram = Histogram(
+            "webhook_stage_seconds",
+            "Durée des étapes des webhooks ElevenLabs (secondes)",
+            ("webhook", "stage", "center_id", "vehicle_type", "branch")
+        )
+
+    def record(self, timer: StageTimer, webhook: str, center_id: str, vehicle_type: str, branch: str) -> None:
+        """Ajoute les étapes d'un appel terminé (et sa durée totale, étape "total")"""
+        if not self.enabled:
+            return
+        observe = self.histogram.observe
+        for stage, elapsed_ns in timer.stages.items():
+            observe(elapsed_ns / 1e9, (webhook, stage, center_id, vehicle_type, branch))
+        if timer.total_ns is not None:
+            observe(timer.total_ns / 1e9, (webhook, "total", center_id, vehicle_type, branch))
+
+    def render(self) -> str:
+        return "\n".join(self.histogram.render()) + "\n"
+
+
+# Instance partagée par l'application
+stage_metrics = StageMetrics()
@@ -31,7 +31,8 @@ class WebSocketConversationalAgent:
         self.logger = logging.getLogger(__name__)
         
         # URL WebSocket ElevenLabs
-        self.ws_url = f"wss://api.elevenlabs.io/v1/convai/conversation?agent_id={self.agent_id}"
+        ws_base_url = os.getenv("ELEVENLABS_WS_BASE_URL", "wss://api.elevenlabs.io").rstrip("/")
+        self.ws_url = f"{ws_base_url}/v1/convai/conversation?agent_id={self.agent_id}"
     
     def _default_message_handler(self, message: Dict[str, Any]) -> None:
         """Gestionnaire de messages par défaut"""
@@ -99,7 +100,7 @@ class WebSocketConversationalAgent:
         conversation_data = user_data or {}
         conversation_data.update({
             "temporal_context": temporal_context,
-            "system_prompt_addition": format_current_context()
+            "system_prompt_addition": temporal_context["context"]  # Même rendu, pas de second formatage
         })
         
         message = {
@@ -116,7 +117,6 @@ class WebSocketConversationalAgent:
         
         # Ajouter contexte temporel si demandé
         if include_temporal_context:
-            temporal_info = get_conversation_metadata()
             message_content = f"{format_current_context()}\n\nMESSAGE UTILISATEUR: {text}"
         
         message = {